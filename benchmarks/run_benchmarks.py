@@ -0,0 +1,345 @@
+"""
+Benchmarks for the caption search, extraction and export hot paths.
+
+Examples:
+    python benchmarks/run_benchmarks.py                    # full run (100 to 100k segments, 10 to 10k videos)
+    python benchmarks/run_benchmarks.py --quick            # small sizes only
+    python benchmarks/run_benchmarks.py --only search --compare benchmarks/results/previous.json
+
+Everything runs offline: transcripts are synthetic, transcript fetches go through a stub
+fetch function, the channel catalog is synced from a stub Data API client, and every
+SQLite store is redirected to a temporary directory. Each case reports the best wall time
+of --repeat runs, the peak traced memory of one extra run and the throughput, and the
+whole run is written as JSON so runs can be compared (--compare exits with status 1 when
+a case got slower than --threshold).
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Keep every store out of data/ before the app modules read their paths
+_TEMP_DIR = tempfile.mkdtemp(prefix="koreanstudy-bench-")
+for _variable, _name in [
+    ("TRANSCRIPT_STORE_PATH", "transcripts.sqlite3"),
+    ("VIDEO_CATALOG_PATH", "video_catalog.sqlite3"),
+    ("TRANSLATION_CACHE_PATH", "translations.sqlite3"),
+    ("QUOTA_USAGE_PATH", "quota_usage.sqlite3"),
+]:
+    os.environ[_variable] = os.path.join(_TEMP_DIR, _name)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import synthetic
+import transcript_fetcher
+import transcript_store
+import translation
+import video_catalog
+from caption_index import CaptionIndex
+from caption_search import search_transcript, search_transcript_terms
+from transcript_align import align_transcripts
+from transcript_columns import TranscriptColumns, EXPORT_COLUMNS
+
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+SEGMENT_SIZES = [100, 1000, 10000, 100000]
+VIDEO_COUNTS = [10, 100, 1000, 10000]
+SEGMENTS_PER_VIDEO = 200
+QUICK_SEGMENT_SIZES = [100, 1000]
+QUICK_VIDEO_COUNTS = [10, 100]
+
+# Simulated latency of one stubbed transcript fetch (seconds)
+FETCH_LATENCY = 0.002
+
+
+def measure(fn, repeat):
+    """(best wall time in seconds, peak traced memory in bytes) of fn()"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # Memory is traced in a separate run: tracemalloc slows allocation-heavy code down a lot
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+# Transcript-size cases: fn(transcript, english) for one video of n segments
+def bench_search(transcript, english):
+    search_transcript(transcript, synthetic.SEARCH_TERMS[0])
+
+
+def bench_search_terms(transcript, english):
+    search_transcript_terms(transcript, synthetic.SEARCH_TERMS)
+
+
+def bench_extract_columns(transcript, english):
+    data = TranscriptColumns("bench")
+    data.add_track('ko', 'Korean', False, transcript)
+    data.add_track('en', 'English', True, english)
+
+
+def bench_export_csv(transcript, english):
+    data = TranscriptColumns("bench")
+    data.add_track('ko', 'Korean', False, transcript)
+    data.add_track('en', 'English', True, english)
+    for export_format in EXPORT_COLUMNS:
+        data.to_csv(export_format)
+
+
+def bench_align(transcript, english):
+    align_transcripts(transcript, english)
+
+
+def bench_store_roundtrip(transcript, english):
+    transcript_store.save_transcript("bench", 'ko', transcript)
+    transcript_store.load_transcript("bench", 'ko')
+
+
+TRANSCRIPT_CASES = {
+    'search': bench_search,
+    'search_terms': bench_search_terms,
+    'extract_columns': bench_extract_columns,
+    'export_csv': bench_export_csv,
+    'align': bench_align,
+    'store_roundtrip': bench_store_roundtrip,
+}
+
+
+# Corpus-size cases: fn(corpus, index) for a channel of n videos
+def bench_index_build(corpus, index):
+    built = CaptionIndex()
+    for video_id, transcript in corpus.items():
+        built.add_transcript(video_id, transcript)
+
+
+def bench_index_search(corpus, index):
+    index.search(synthetic.SEARCH_TERMS[1])
+
+
+def bench_index_search_terms(corpus, index):
+    index.search_terms(synthetic.SEARCH_TERMS)
+
+
+def bench_scan_search(corpus, index):
+    # The same query without the index: every transcript is scanned
+    for transcript in corpus.values():
+        search_transcript(transcript, synthetic.SEARCH_TERMS[1])
+
+
+def bench_fetch_pool(corpus, index):
+    def fetch_one(video_id, language):
+        time.sleep(FETCH_LATENCY)
+        return corpus[video_id]
+    for _ in transcript_fetcher.iter_transcripts(list(corpus), 'ko', fetch_one=fetch_one):
+        pass
+
+
+def bench_translate_batch(corpus, index):
+    # Only the first run translates; later runs measure the persistent cache hit path
+    backend = translation.DictionaryBackend()
+    texts = [entry['text'] for transcript in corpus.values() for entry in transcript[:5]]
+    translation.translate_batch(texts, backend.translate_many)
+
+
+class StubYouTube:
+    """Minimal stand-in for the Data API client used by video_catalog.sync_channel"""
+
+    def __init__(self, video_ids):
+        self.video_ids = video_ids
+
+    def channels(self):
+        return self
+
+    def playlistItems(self):
+        return self
+
+    def videos(self):
+        return StubVideos()
+
+    def list(self, part=None, id=None, playlistId=None, maxResults=50, pageToken=None):
+        if id is not None:
+            return StubRequest({'items': [{'contentDetails': {'relatedPlaylists': {'uploads': 'UUbench'}}}]})
+        first = int(pageToken or 0)
+        page = self.video_ids[first:first + maxResults]
+        response = {'items': [
+            {
+                'snippet': {
+                    'title': f"Video {video_id}",
+                    'channelTitle': "Benchmark",
+                    'channelId': 'UCbench',
+                    # Uploads are listed newest first
+                    'publishedAt': (datetime(2024, 1, 1) - timedelta(minutes=n)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'resourceId': {'videoId': video_id},
+                },
+                'contentDetails': {'videoId': video_id},
+            }
+            for n, video_id in enumerate(page, start=first)
+        ]}
+        if first + maxResults < len(self.video_ids):
+            response['nextPageToken'] = str(first + maxResults)
+        return StubRequest(response)
+
+
+class StubVideos:
+    def list(self, part=None, id=None, maxResults=50):
+        return StubRequest({'items': [
+            {'id': video_id, 'statistics': {'viewCount': str(len(video_id))}} for video_id in id.split(',')
+        ]})
+
+
+class StubRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+_channel_numbers = itertools.count()
+
+
+def bench_catalog_sync(corpus, index):
+    # A new channel every run, so each run is a full first crawl rather than a delta sync
+    channel_id = f"UCbench{next(_channel_numbers)}"
+    video_catalog.sync_channel(StubYouTube(list(corpus)), channel_id)
+    video_catalog.load_channel_videos(channel_id)
+
+
+CORPUS_CASES = {
+    'index_build': bench_index_build,
+    'index_search': bench_index_search,
+    'index_search_terms': bench_index_search_terms,
+    'scan_search': bench_scan_search,
+    'fetch_pool': bench_fetch_pool,
+    'translate_batch': bench_translate_batch,
+    'catalog_sync': bench_catalog_sync,
+}
+
+
+def run(segment_sizes, video_counts, only, repeat):
+    results = []
+
+    def record(name, size, unit, fn, items):
+        seconds, peak = measure(fn, repeat)
+        result = {
+            'name': name,
+            'size': size,
+            'unit': unit,
+            'seconds': round(seconds, 6),
+            'peak_bytes': peak,
+            'throughput': round(items / seconds, 1) if seconds else None,
+        }
+        results.append(result)
+        print(f"{name:<20} {size:>8} {unit:<8} {seconds * 1000:>11.2f} ms {peak / 2 ** 20:>9.2f} MiB "
+              f"{result['throughput'] or 0:>14,.0f} {unit}/s", flush=True)
+
+    for segments in segment_sizes:
+        transcript = synthetic.make_transcript(segments)
+        english = synthetic.make_english_track(transcript)
+        for name, case in TRANSCRIPT_CASES.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            record(name, segments, 'segments', lambda: case(transcript, english), segments)
+
+    for videos in video_counts:
+        corpus = synthetic.make_corpus(videos, SEGMENTS_PER_VIDEO)
+        index = CaptionIndex()
+        for video_id, transcript in corpus.items():
+            index.add_transcript(video_id, transcript)
+        for name, case in CORPUS_CASES.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            record(name, videos, 'videos', lambda: case(corpus, index), videos)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path, threshold):
+    """Print the change against a previous results file; returns the number of regressions"""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {(result['name'], result['size']): result for result in json.load(f)['results']}
+    regressions = 0
+    print(f"\nCompared with {previous_path} (regression threshold {threshold:.0%}):")
+    for result in results:
+        before = previous.get((result['name'], result['size']))
+        if not before or not before['seconds']:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  <-- slower"
+        print(f"{result['name']:<20} {result['size']:>8} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark caption search, extraction and export on synthetic data")
+    parser.add_argument("--quick", action="store_true", help="only the small sizes")
+    parser.add_argument("--segments", type=int, nargs="+", help=f"transcript sizes (default: {SEGMENT_SIZES})")
+    parser.add_argument("--videos", type=int, nargs="+", help=f"corpus sizes (default: {VIDEO_COUNTS})")
+    parser.add_argument("--only", nargs="+", help="run only cases whose name starts with one of these")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is reported")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown counted as a regression (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    segment_sizes = args.segments or (QUICK_SEGMENT_SIZES if args.quick else SEGMENT_SIZES)
+    video_counts = args.videos or (QUICK_VIDEO_COUNTS if args.quick else VIDEO_COUNTS)
+
+    print(f"{'case':<20} {'size':>8} {'unit':<8} {'wall time':>14} {'peak memory':>13} {'throughput':>19}")
+    results = run(segment_sizes, video_counts, args.only, args.repeat)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    folder = os.path.dirname(output)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
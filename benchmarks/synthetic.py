@@ -0,0 +1,63 @@
+import random
+
+# Deterministic synthetic captions for the benchmarks: Korean sentences built from a small
+# vocabulary and common grammar endings, split into caption-sized segments the way
+# auto-captions split speech, plus a time-shifted English track for alignment.
+WORDS = [
+    '오늘', '내일', '어제', '친구', '학교', '회사', '밥', '커피', '영화', '음악', '날씨', '집',
+    '시간', '사람', '정말', '진짜', '너무', '같이', '먼저', '다시', '여기', '거기', '우리', '그냥',
+]
+VERBS = ['먹', '가', '보', '하', '만나', '좋아하', '기다리', '마시', '듣', '알']
+ENDINGS = ['는데', '거든요', '잖아요', '어요', '습니다', '지만', '고 싶어요', '네요', '을까요?', '죠.']
+ENGLISH = ['today', 'friend', 'school', 'coffee', 'movie', 'really', 'together', 'again', 'we', 'just', 'wait', 'eat']
+
+# Terms searched by the benchmarks (a common, a rarer and a boundary-spanning pattern)
+SEARCH_TERMS = ['는데', '거든요', '잖아요']
+
+
+def korean_sentence(rng):
+    words = rng.sample(WORDS, rng.randint(2, 5))
+    return ' '.join(words) + ' ' + rng.choice(VERBS) + rng.choice(ENDINGS)
+
+
+def make_transcript(segments, seed=0):
+    """A Korean transcript of the given number of segments"""
+    rng = random.Random(seed)
+    transcript = []
+    start = 0.0
+    words = []
+    while len(transcript) < segments:
+        if not words:
+            words = korean_sentence(rng).split()
+        # Auto-captions cut segments mid-sentence every few words
+        take = rng.randint(2, 5)
+        text, words = ' '.join(words[:take]), words[take:]
+        duration = round(rng.uniform(1.5, 3.5), 2)
+        transcript.append({'text': text, 'start': round(start, 2), 'duration': duration})
+        start += duration + (rng.uniform(0.5, 2.0) if rng.random() < 0.2 else 0.0)
+    return transcript
+
+
+def make_english_track(transcript, seed=0):
+    """An English track with its own segmentation, offset from the Korean timing"""
+    rng = random.Random(seed + 1)
+    english = []
+    for i in range(0, len(transcript), 2):
+        first = transcript[i]
+        last = transcript[min(i + 1, len(transcript) - 1)]
+        start = first['start'] + rng.uniform(-0.3, 0.3)
+        end = last['start'] + last['duration'] + rng.uniform(-0.3, 0.3)
+        english.append({
+            'text': ' '.join(rng.sample(ENGLISH, rng.randint(3, 6))),
+            'start': round(max(start, 0.0), 2),
+            'duration': round(max(end - start, 0.1), 2),
+        })
+    return english
+
+
+def make_corpus(videos, segments_per_video, seed=0):
+    """{video_id: transcript} for a channel-sized corpus"""
+    return {
+        f"vid{i:07d}": make_transcript(segments_per_video, seed=seed + i)
+        for i in range(videos)
+    }
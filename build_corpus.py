@@ -0,0 +1,141 @@
+"""
+Build the offline caption corpus used by the YouTube caption search page.
+
+Examples:
+    python build_corpus.py --curated --api-key YOUR_KEY
+    python build_corpus.py --channel UCaKod3X1Tn4c7Ci0iUKcvzQ --api-key YOUR_KEY --parquet data/corpus.parquet
+    python build_corpus.py --video dQw4w9WgXcQ --video https://youtu.be/xyz
+
+Transcripts go through the same store-backed, rate-limited fetch functions as the app,
+so rerunning the builder only fetches videos that are not stored yet.
+
+New videos are merged into an existing corpus at --output (videos built again replace
+their old rows); pass --replace to write only this run's videos. A running app picks
+up the rebuilt corpus on its next rerun.
+"""
+import argparse
+import os
+import sys
+import caption_corpus
+import transcript_fetcher
+import video_catalog
+
+# Set up logging
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def extract_video_id(url):
+    """Extract video ID from YouTube URL"""
+    try:
+        if 'v=' in url:
+            return url.split('v=')[1].split('&')[0]
+        elif 'youtu.be/' in url:
+            return url.split('youtu.be/')[1].split('?')[0]
+        return url
+    except:
+        return url
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build a columnar caption corpus from YouTube channels and videos")
+    parser.add_argument("--curated", action="store_true", help="include every channel in CURATED_CHANNELS")
+    parser.add_argument("--channel", action="append", default=[], help="channel id to crawl (repeatable)")
+    parser.add_argument("--video", action="append", default=[], help="video id or URL (repeatable)")
+    parser.add_argument("--language", default="ko", help="caption language code (default: ko)")
+    parser.add_argument("--subtitle-language", default="en",
+                        help="also store this subtitle track for each video, shown next to matches (default: en; '' to skip)")
+    parser.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"),
+                        help="YouTube Data API key for crawling channels (default: $YOUTUBE_API_KEY)")
+    parser.add_argument("--output", default=caption_corpus.CORPUS_PATH, help="Arrow IPC output file")
+    parser.add_argument("--parquet", help="also write a Parquet copy to this path")
+    parser.add_argument("--replace", action="store_true", help="replace the existing corpus instead of merging into it")
+    parser.add_argument("--workers", type=int, default=transcript_fetcher.FETCH_WORKERS, help="parallel transcript fetches")
+    return parser.parse_args(argv)
+
+
+def fetch_rows(videos, video_ids, language, workers):
+    """
+    Corpus rows for one caption language of video_ids (videos maps video_id -> channel_id).
+    Returns (rows, videos built, videos failed).
+    """
+    rows = []
+    built = 0
+    failed = 0
+    for done, (video_id, track, error) in enumerate(transcript_fetcher.iter_transcripts(
+            video_ids, language, max_workers=workers, fetch_one=transcript_fetcher.get_transcript_track), start=1):
+        if error:
+            failed += 1
+            logger.warning(f"[{done}/{len(video_ids)}] {video_id} ({language}): {error}")
+            continue
+        transcript, caption_type, _ = track
+        if not transcript:
+            logger.info(f"[{done}/{len(video_ids)}] {video_id}: no {language} captions")
+            continue
+        for i, entry in enumerate(transcript):
+            rows.append({
+                'video_id': video_id,
+                'channel_id': videos[video_id],
+                'segment_no': i + 1,
+                'start': entry['start'],
+                'duration': entry.get('duration', 0),
+                'text': entry['text'].strip(),
+                'language': language,
+                'caption_type': caption_type,
+            })
+        built += 1
+        logger.info(f"[{done}/{len(video_ids)}] {video_id} ({language}): {len(transcript)} segments")
+    return rows, built, failed
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    channel_ids = list(args.channel)
+    if args.curated:
+        channel_ids += [channel_id for channel_id in video_catalog.CURATED_CHANNELS.values() if channel_id not in channel_ids]
+
+    # video_id -> channel_id (None for loose videos)
+    videos = {extract_video_id(video): None for video in args.video}
+
+    if channel_ids:
+        if not args.api_key:
+            logger.error("Crawling channels needs a YouTube API key (--api-key or $YOUTUBE_API_KEY)")
+            return 1
+        from youtube_endpoints import build_youtube
+        youtube = build_youtube(args.api_key)
+        for channel_id in channel_ids:
+            video_catalog.sync_channel(youtube, channel_id)
+            for item in video_catalog.load_channel_videos(channel_id):
+                videos[item['id']['videoId']] = channel_id
+
+    if not videos:
+        logger.error("Nothing to build: pass --curated, --channel or --video")
+        return 1
+
+    rows, built, failed = fetch_rows(videos, list(videos), args.language, args.workers)
+
+    # Subtitle track of every built video, so the app can show real subtitles next to
+    # matches without asking YouTube
+    if args.subtitle_language and args.subtitle_language != args.language:
+        built_ids = list(dict.fromkeys(row['video_id'] for row in rows))
+        subtitle_rows, subtitled, _ = fetch_rows(videos, built_ids, args.subtitle_language, args.workers)
+        rows += subtitle_rows
+        logger.info(f"Added {args.subtitle_language} subtitles for {subtitled} of {len(built_ids)} videos")
+
+    # Keep the existing corpus's other videos
+    existing = None if args.replace else caption_corpus.load_corpus(args.output)
+    if existing is not None:
+        built_tracks = {(row['video_id'], row['language']) for row in rows}
+        kept = [row for row in existing.table.to_pylist() if (row['video_id'], row['language']) not in built_tracks]
+        logger.info(f"Merging into {args.output}: keeping {len(kept)} existing segments")
+        rows += kept
+
+    table = caption_corpus.write_corpus(rows, args.output, args.parquet)
+    logger.info(f"Wrote {table.num_rows} segments from {built} videos to {args.output} ({failed} failed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import os
+import pyarrow as pa
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Columnar transcript corpus built offline by build_corpus.py and read by the app.
+# Stored as an Arrow IPC file so it can be memory-mapped read-only: loading it costs no
+# copies and many app processes can share the same pages.
+CORPUS_PATH = os.environ.get("CAPTION_CORPUS_PATH", os.path.join("data", "caption_corpus.arrow"))
+
+CORPUS_SCHEMA = pa.schema([
+    ('video_id', pa.string()),
+    ('channel_id', pa.string()),
+    ('segment_no', pa.int32()),
+    ('start', pa.float64()),
+    ('duration', pa.float64()),
+    ('text', pa.string()),
+    ('language', pa.string()),
+    ('caption_type', pa.string()),
+])
+
+
+def write_corpus(rows, path=CORPUS_PATH, parquet_path=None):
+    """
+    Write corpus rows (dicts with the CORPUS_SCHEMA columns) as an Arrow IPC file,
+    and optionally also as Parquet. Rows are sorted by video, language and segment.
+    """
+    rows = sorted(rows, key=lambda row: (row['video_id'], row['language'], row['segment_no']))
+    table = pa.Table.from_pylist(rows, schema=CORPUS_SCHEMA)
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    # Write to a temporary file first so a running app never maps a half-written corpus
+    temporary_path = path + ".tmp"
+    with pa.OSFile(temporary_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_path, path)
+
+    if parquet_path:
+        import pyarrow.parquet as pq
+        pq.write_table(table, parquet_path)
+    return table
+
+
+class CaptionCorpus:
+    """Read-only, memory-mapped view of the corpus with per-track (video, language) segment ranges"""
+
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        self.table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+        # Rows are sorted by video and language, so each track is one contiguous range
+        self.ranges = {}     # (video_id, language) -> (first row, row count)
+        self.languages = {}  # video_id -> caption languages
+        self.channels = {}
+        video_ids = self.table.column('video_id').to_pylist()
+        channel_ids = self.table.column('channel_id').to_pylist()
+        languages = self.table.column('language').to_pylist()
+        for row, (video_id, language) in enumerate(zip(video_ids, languages)):
+            key = (video_id, language)
+            if key in self.ranges:
+                first, count = self.ranges[key]
+                self.ranges[key] = (first, count + 1)
+                continue
+            self.ranges[key] = (row, 1)
+            if video_id not in self.languages:
+                self.languages[video_id] = []
+                if channel_ids[row]:
+                    self.channels.setdefault(channel_ids[row], []).append(video_id)
+            self.languages[video_id].append(language)
+        logger.info(f"Loaded caption corpus {path}: {self.table.num_rows} segments from {len(self.languages)} videos")
+
+    def __contains__(self, video_id):
+        return video_id in self.languages
+
+    def __len__(self):
+        return len(self.languages)
+
+    def has_transcript(self, video_id, language):
+        """Whether the corpus holds video_id with captions in language"""
+        return (video_id, language) in self.ranges
+
+    def channel_video_ids(self, channel_id, language=None):
+        """Corpus videos of a channel, optionally only those captioned in language"""
+        video_ids = self.channels.get(channel_id, [])
+        if language is None:
+            return video_ids
+        return [video_id for video_id in video_ids if (video_id, language) in self.ranges]
+
+    def get_transcript(self, video_id, language):
+        """
+        One video's segments in language, in the same shape as YouTubeTranscriptApi.get_transcript;
+        None if the corpus has no such track
+        """
+        if (video_id, language) not in self.ranges:
+            return None
+        first, count = self.ranges[(video_id, language)]
+        segment = self.table.slice(first, count)
+        return [
+            {'text': text, 'start': start, 'duration': duration}
+            for text, start, duration in zip(
+                segment.column('text').to_pylist(),
+                segment.column('start').to_pylist(),
+                segment.column('duration').to_pylist()
+            )
+        ]
+
+
+def corpus_version(path=CORPUS_PATH):
+    """Modification time of the corpus file (None if it has not been built); changes on every rebuild"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def load_corpus(path=CORPUS_PATH):
+    """The corpus at path, or None if it has not been built"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return CaptionCorpus(path)
+    except (pa.ArrowInvalid, OSError) as e:
+        logger.error(f"Error loading caption corpus {path}: {e}")
+        return None
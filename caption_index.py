@@ -0,0 +1,122 @@
+import threading
+from collections import defaultdict, Counter
+from caption_search import TranscriptBuffer, compile_query, compile_terms
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+
+def character_ngrams(text, n=2):
+    """Character n-grams of a lowercased string (bigrams work well for Hangul syllables)"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class CaptionIndex:
+    """
+    Inverted character n-gram index over caption transcripts.
+
+    Each posting list maps an n-gram to the videos whose caption text contains it. The
+    n-grams are taken from the whole transcript with spacing removed, so phrases that
+    run across segment boundaries are indexed too. A search intersects the posting lists
+    of the query's n-grams and then verifies the surviving videos with one regex pass over
+    their TranscriptBuffer. New transcripts can be added at any time; the index is updated
+    incrementally.
+    """
+
+    def __init__(self, n=2):
+        self.n = n
+        self.postings = defaultdict(set)
+        self.buffers = {}  # video_id -> TranscriptBuffer
+        self._lock = threading.Lock()
+
+    def __contains__(self, video_id):
+        return video_id in self.buffers
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def _grams(self, text):
+        return character_ngrams(''.join(text.lower().split()), self.n)
+
+    def add_transcript(self, video_id, transcript):
+        """Index (or re-index) one video's transcript"""
+        buffer = TranscriptBuffer(transcript)
+        with self._lock:
+            if video_id in self.buffers:
+                self._remove(video_id)
+            for gram in self._grams(buffer.text):
+                self.postings[gram].add(video_id)
+            self.buffers[video_id] = buffer
+
+    def _remove(self, video_id):
+        for gram in self._grams(self.buffers.pop(video_id).text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(video_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def candidates(self, query, video_ids=None):
+        """Indexed videos (restricted to video_ids) that may contain query, in index order"""
+        with self._lock:
+            if video_ids is None:
+                video_ids = list(self.buffers)
+            else:
+                video_ids = [video_id for video_id in video_ids if video_id in self.buffers]
+
+            grams = self._grams(query)
+            if not grams:
+                # Query shorter than one n-gram: every video has to be scanned
+                return video_ids
+            # Intersect the shortest posting lists first
+            posting_lists = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(posting_lists[0])
+            for posting in posting_lists[1:]:
+                candidates &= posting
+                if not candidates:
+                    break
+            return [video_id for video_id in video_ids if video_id in candidates]
+
+    def _buffers(self, video_ids):
+        """
+        {video_id: TranscriptBuffer} for the given videos, taken under the lock so a
+        concurrent re-index can't remove a buffer while a search is reading it
+        """
+        with self._lock:
+            return {video_id: self.buffers[video_id] for video_id in video_ids if video_id in self.buffers}
+
+    def search(self, query, video_ids=None):
+        """Same result shape as search_transcript: {video_id: [(start_time, sentence text), ...]}"""
+        pattern = compile_query(query)
+        if pattern is None:
+            return {}
+        results = {}
+        for video_id, buffer in self._buffers(self.candidates(query, video_ids)).items():
+            matches = buffer.search(pattern)
+            if matches:
+                results[video_id] = matches
+        return results
+
+    def search_terms(self, terms, video_ids=None):
+        """
+        Several terms at once; each candidate video is scanned once per term, so overlapping
+        terms are all reported.
+        Returns ({video_id: [(start_time, sentence text, term), ...]}, Counter of hits per term).
+        """
+        patterns = compile_terms(terms)
+        if not patterns:
+            return {}, Counter()
+        candidates = set()
+        for term, _ in patterns:
+            candidates.update(self.candidates(term, video_ids))
+        with self._lock:
+            order = video_ids if video_ids is not None else list(self.buffers)
+        results = {}
+        counts = Counter()
+        for video_id, buffer in self._buffers(video_id for video_id in order if video_id in candidates).items():
+            matches, video_counts = buffer.search_terms(patterns)
+            counts.update(video_counts)
+            if matches:
+                results[video_id] = matches
+        return results, counts
@@ -0,0 +1,159 @@
+import os
+import re
+from array import array
+from collections import Counter
+from bisect import bisect_right
+
+# Searching captions across segment boundaries.
+# Each transcript is flattened into one text buffer (segments joined by a space) with an
+# array of the offset where every segment starts. Queries run over the whole buffer in one
+# pass, so a phrase that auto-captions split across two segments is still found, and each
+# hit is mapped back to its segments (and start time) by binary search on the offsets.
+# Segments are grouped into sentences by the pause before them, so a match is shown with
+# the sentence it belongs to rather than just its own segment.
+SENTENCE_GAP = float(os.environ.get("CAPTION_SENTENCE_GAP", 0.5))                   # seconds of silence
+SENTENCE_MAX_SEGMENTS = int(os.environ.get("CAPTION_SENTENCE_MAX_SEGMENTS", 4))     # auto-captions rarely pause
+SENTENCE_END = ('.', '?', '!', '…', '。')
+
+
+def compile_query(query):
+    """
+    Regular expression for a search query that ignores case and spacing, so '먹었어요'
+    also matches '먹었 어요' split over two segments. None for an empty query.
+    """
+    characters = [re.escape(character) for character in query if not character.isspace()]
+    if not characters:
+        return None
+    return re.compile(r'\s*'.join(characters), re.IGNORECASE)
+
+
+def parse_terms(text, multiple=False):
+    """
+    Search terms from the query. By default the whole query is one term, so a phrase
+    like '네, 알겠어요' is searched as written. With multiple=True it is split on commas,
+    e.g. '-는데, -거든요, ~잖아요'; the '-' / '~' that mark grammar endings are dropped and
+    duplicates and empty terms are skipped.
+    """
+    if not multiple:
+        return [text.strip()] if text.strip() else []
+    terms = []
+    for term in text.split(','):
+        term = term.strip().strip('-~').strip()
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def compile_terms(terms):
+    """
+    One compiled pattern per term as [(term, pattern)], skipping empty terms. Each term
+    is scanned separately, so overlapping terms (e.g. '는데' and '데요' in '는데요') are
+    all reported rather than one hiding the other.
+    """
+    compiled = []
+    for term in terms:
+        pattern = compile_query(term)
+        if pattern is not None:
+            compiled.append((term, pattern))
+    return compiled
+
+
+class TranscriptBuffer:
+    """One video's captions as a single searchable text with segment offsets and sentences"""
+
+    def __init__(self, transcript, sentence_gap=SENTENCE_GAP, max_segments=SENTENCE_MAX_SEGMENTS):
+        texts = [' '.join(entry['text'].split()) for entry in transcript]
+        self.text = ' '.join(texts)
+        self.starts = array('d', (entry['start'] for entry in transcript))
+        self.offsets = array('I')
+        offset = 0
+        for text in texts:
+            self.offsets.append(offset)
+            offset += len(text) + 1
+
+        # sentence_first[i] / sentence_stop[i]: the segment range of segment i's sentence
+        self.sentence_first = array('I')
+        first = 0
+        previous_end = None
+        for i, entry in enumerate(transcript):
+            if i and (
+                entry['start'] - previous_end > sentence_gap
+                or texts[i - 1].endswith(SENTENCE_END)
+                or i - first >= max_segments
+            ):
+                first = i
+            self.sentence_first.append(first)
+            previous_end = entry['start'] + entry.get('duration', 0)
+        self.sentence_stop = array('I', [0] * len(texts))
+        stop = len(texts)
+        for i in range(len(texts) - 1, -1, -1):
+            self.sentence_stop[i] = stop
+            if self.sentence_first[i] == i:
+                stop = i
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def segment_at(self, offset):
+        """Index of the segment containing buffer offset"""
+        return bisect_right(self.offsets, offset) - 1
+
+    def segment_text(self, first, stop):
+        """Text of segments first:stop"""
+        end = self.offsets[stop] - 1 if stop < len(self) else len(self.text)
+        return self.text[self.offsets[first]:end]
+
+    def find(self, pattern):
+        """(first segment, last segment, match) for every match of a compiled pattern"""
+        hits = []
+        for match in pattern.finditer(self.text):
+            hits.append((self.segment_at(match.start()), self.segment_at(match.end() - 1), match))
+        return hits
+
+    def search(self, pattern):
+        """
+        [(start time, sentence text)] with one entry per segment where a match begins;
+        the text covers every sentence the match touches.
+        """
+        results = []
+        last_first = None
+        for first, last, _ in self.find(pattern):
+            if first == last_first:
+                continue
+            last_first = first
+            results.append((self.starts[first], self.segment_text(self.sentence_first[first], self.sentence_stop[last])))
+        return results
+
+    def search_terms(self, patterns):
+        """
+        Multi-term search with compile_terms patterns, one pass over the text per term.
+        Returns ([(start time, sentence text, term)] in time order, Counter of hits per term).
+        """
+        results = []
+        counts = Counter()
+        for order, (term, pattern) in enumerate(patterns):
+            last_first = None
+            for first, last, _ in self.find(pattern):
+                counts[term] += 1
+                if first == last_first:
+                    continue
+                last_first = first
+                results.append((first, order, self.starts[first], self.segment_text(self.sentence_first[first], self.sentence_stop[last]), term))
+        results.sort(key=lambda result: result[:2])
+        return [result[2:] for result in results], counts
+
+
+def search_transcript(transcript, query):
+    """Matches of query in one transcript as [(start time, sentence text)]"""
+    pattern = compile_query(query)
+    if pattern is None or not transcript:
+        return []
+    return TranscriptBuffer(transcript).search(pattern)
+
+
+def search_transcript_terms(transcript, terms):
+    """Matches of several terms in one transcript: ([(start time, sentence text, term)], Counter)"""
+    patterns = compile_terms(terms)
+    if not patterns or not transcript:
+        return [], Counter()
+    return TranscriptBuffer(transcript).search_terms(patterns)
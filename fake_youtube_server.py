@@ -0,0 +1,392 @@
+"""
+Local stand-in for the YouTube endpoints the apps use, for load and cache testing offline.
+
+Serves the Data API v3 calls (search.list, videos.list, channels.list, playlistItems.list)
+under /youtube/v3/ and the watch page and timedtext responses that youtube_transcript_api
+reads caption tracks from, all from a fixture file. Latency, error rate, throttling and
+the daily quota can be configured, so retries, circuit breaking, caching and the quota
+guard can be exercised without spending real quota.
+
+Examples:
+    python fake_youtube_server.py                               # fixtures/youtube.json on port 8765
+    python fake_youtube_server.py --synthetic 500 --latency 0.2 --error-rate 0.05 --quota 2000
+
+Then point the apps at it (any API key works, except "invalid"):
+    YOUTUBE_FAKE_SERVER=http://localhost:8765 streamlit run koreanstudyYT_mtapi.py
+
+Fixture format:
+    {"channels": [{"id": "UC...", "title": "...", "videos": ["video id", ...]}],
+     "videos": {"video id": {"title": "...", "channel_id": "UC...", "published_at": "2024-01-01T00:00:00Z",
+                              "view_count": 123,
+                              "tracks": [{"language_code": "ko", "name": "Korean", "generated": false,
+                                          "segments": [{"text": "...", "start": 0.0, "duration": 2.0}]}]}}}
+A video without tracks has captions disabled; an unknown video id is unavailable.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+from xml.sax.saxutils import escape
+import quota
+import video_catalog
+
+# Set up logging
+import logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIXTURES_PATH = os.path.join("fixtures", "youtube.json")
+
+# Languages offered for auto-translation of every track (like YouTube's translationLanguages)
+TRANSLATION_LANGUAGES = {'en': "English", 'ja': "Japanese", 'zh-Hans': "Chinese (Simplified)", 'es': "Spanish"}
+
+
+def load_fixtures(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def synthetic_fixtures(videos_per_channel, seed=0):
+    """Fixtures for the curated channels with generated Korean (and some English) captions"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+    import synthetic
+
+    rng = random.Random(seed)
+    fixtures = {'channels': [], 'videos': {}}
+    for channel_number, (title, channel_id) in enumerate(video_catalog.CURATED_CHANNELS.items()):
+        video_ids = []
+        for n in range(videos_per_channel):
+            video_id = f"fake{channel_number:02d}{n:05d}"
+            video_ids.append(video_id)
+            tracks = []
+            # Roughly one video in ten has no captions at all
+            if rng.random() > 0.1:
+                transcript = synthetic.make_transcript(rng.randint(50, 400), seed=seed + channel_number * 100000 + n)
+                tracks.append({'language_code': 'ko', 'name': "Korean", 'generated': rng.random() < 0.5, 'segments': transcript})
+                if rng.random() < 0.3:
+                    tracks.append({'language_code': 'en', 'name': "English", 'generated': False,
+                                   'segments': synthetic.make_english_track(transcript, seed=n)})
+            fixtures['videos'][video_id] = {
+                'title': f"{title} #{videos_per_channel - n}",
+                'channel_id': channel_id,
+                # Newest first, like an uploads playlist
+                'published_at': (datetime(2024, 6, 1) - timedelta(hours=n)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'view_count': rng.randint(1000, 5000000),
+                'tracks': tracks,
+            }
+        fixtures['channels'].append({'id': channel_id, 'title': title, 'videos': video_ids})
+    return fixtures
+
+
+class FakeYouTube:
+    """Fixture data plus the simulated network conditions, shared by all request threads"""
+
+    def __init__(self, fixtures, latency=0.0, error_rate=0.0, throttle_rate=0.0, quota_units=quota.DAILY_BUDGET, seed=None):
+        self.channels = {channel['id']: channel for channel in fixtures['channels']}
+        self.videos = fixtures['videos']
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.quota_units = quota_units
+        self.units_used = {}  # API key -> units spent
+        self.requests = {}    # endpoint -> count
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def simulate_network(self, endpoint):
+        """Sleep for the configured latency (±50% jitter) and decide whether this request fails"""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            delay = self.latency * self.random.uniform(0.5, 1.5)
+            failed = self.random.random() < self.error_rate
+            throttled = self.random.random() < self.throttle_rate
+        if delay:
+            time.sleep(delay)
+        return failed, throttled
+
+    def spend(self, api_key, endpoint):
+        """Charge the endpoint's unit cost to the key; False once the daily quota is used up"""
+        units = quota.UNIT_COSTS.get(endpoint, quota.DEFAULT_UNIT_COST)
+        with self._lock:
+            used = self.units_used.get(api_key, 0)
+            if used + units > self.quota_units:
+                return False
+            self.units_used[api_key] = used + units
+            return True
+
+    def video_resource(self, video_id, parts):
+        video = self.videos[video_id]
+        resource = {'kind': "youtube#video", 'id': video_id}
+        if 'snippet' in parts:
+            resource['snippet'] = self.snippet(video_id)
+        if 'statistics' in parts:
+            resource['statistics'] = {'viewCount': str(video.get('view_count', 0))}
+        return resource
+
+    def snippet(self, video_id):
+        video = self.videos[video_id]
+        channel = self.channels.get(video.get('channel_id'), {})
+        return {
+            'title': video.get('title', video_id),
+            'channelId': video.get('channel_id'),
+            'channelTitle': channel.get('title', ''),
+            'publishedAt': video.get('published_at', ''),
+        }
+
+
+def page(items, query, default_size=5):
+    """Slice items for maxResults/pageToken; returns (page items, next page token or None)"""
+    size = min(int(query.get('maxResults', default_size)), 50)
+    first = int(query.get('pageToken') or 0)
+    next_token = str(first + size) if first + size < len(items) else None
+    return items[first:first + size], next_token
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    youtube = None  # FakeYouTube, set by serve()
+    server_url = ""
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_text(self, status, text, content_type):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f"{content_type}; charset=UTF-8")
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_api_error(self, status, reason, message):
+        self.send_json(status, {'error': {
+            'code': status,
+            'message': message,
+            'errors': [{'message': message, 'domain': "youtube.quota" if reason == 'quotaExceeded' else "global", 'reason': reason}],
+        }})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path.startswith('/youtube/v3/'):
+            self.handle_api(url.path[len('/youtube/v3/'):].strip('/'), query)
+        elif url.path == '/watch':
+            self.handle_watch(query)
+        elif url.path == '/timedtext':
+            self.handle_timedtext(query)
+        elif url.path == '/stats':
+            with self.youtube._lock:
+                self.send_json(200, {'requests': self.youtube.requests, 'units_used': self.youtube.units_used})
+        else:
+            self.send_text(404, "Not found", 'text/plain')
+
+    # YouTube Data API v3
+    def handle_api(self, resource, query):
+        endpoint = f"{resource}.list"
+        handlers = {
+            'search': self.api_search,
+            'videos': self.api_videos,
+            'channels': self.api_channels,
+            'playlistItems': self.api_playlist_items,
+        }
+        if resource not in handlers:
+            self.send_api_error(404, 'notFound', f"Unknown resource {resource}")
+            return
+
+        failed, _ = self.youtube.simulate_network(endpoint)
+        api_key = query.get('key', '')
+        if api_key in ('', 'invalid'):
+            self.send_api_error(400, 'keyInvalid', "API key not valid. Please pass a valid API key.")
+            return
+        if not self.youtube.spend(api_key, endpoint):
+            self.send_api_error(403, 'quotaExceeded', "The request cannot be completed because you have exceeded your quota.")
+            return
+        if failed:
+            self.send_api_error(500, 'backendError', "Backend Error")
+            return
+        self.send_json(200, handlers[resource](query))
+
+    def api_search(self, query):
+        search_query = query.get('q', '').lower()
+        channel_id = query.get('channelId')
+        video_ids = [
+            video_id for video_id, video in self.youtube.videos.items()
+            if (not channel_id or video.get('channel_id') == channel_id)
+            and search_query in video.get('title', '').lower()
+        ]
+        if query.get('order') == 'viewCount':
+            video_ids.sort(key=lambda video_id: -self.youtube.videos[video_id].get('view_count', 0))
+        else:
+            video_ids.sort(key=lambda video_id: self.youtube.videos[video_id].get('published_at', ''), reverse=True)
+        items, next_token = page(video_ids, query)
+        response = {
+            'kind': "youtube#searchListResponse",
+            'pageInfo': {'totalResults': len(video_ids), 'resultsPerPage': len(items)},
+            'items': [
+                {'kind': "youtube#searchResult", 'id': {'kind': "youtube#video", 'videoId': video_id}, 'snippet': self.youtube.snippet(video_id)}
+                for video_id in items
+            ],
+        }
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+    def api_videos(self, query):
+        parts = query.get('part', 'snippet').split(',')
+        video_ids = [video_id for video_id in query.get('id', '').split(',') if video_id in self.youtube.videos]
+        return {
+            'kind': "youtube#videoListResponse",
+            'items': [self.youtube.video_resource(video_id, parts) for video_id in video_ids],
+        }
+
+    def api_channels(self, query):
+        items = []
+        for channel_id in query.get('id', '').split(','):
+            if channel_id in self.youtube.channels:
+                items.append({
+                    'kind': "youtube#channel",
+                    'id': channel_id,
+                    'snippet': {'title': self.youtube.channels[channel_id].get('title', '')},
+                    'contentDetails': {'relatedPlaylists': {'uploads': "UU" + channel_id[2:]}},
+                })
+        return {'kind': "youtube#channelListResponse", 'items': items}
+
+    def api_playlist_items(self, query):
+        playlist_id = query.get('playlistId', '')
+        channel = self.youtube.channels.get("UC" + playlist_id[2:]) if playlist_id.startswith('UU') else None
+        video_ids = sorted(
+            channel['videos'] if channel else [],
+            key=lambda video_id: self.youtube.videos[video_id].get('published_at', ''),
+            reverse=True
+        )
+        items, next_token = page(video_ids, query)
+        response = {
+            'kind': "youtube#playlistItemListResponse",
+            'pageInfo': {'totalResults': len(video_ids), 'resultsPerPage': len(items)},
+            'items': [
+                {
+                    'kind': "youtube#playlistItem",
+                    'snippet': dict(self.youtube.snippet(video_id), playlistId=playlist_id, resourceId={'kind': "youtube#video", 'videoId': video_id}),
+                    'contentDetails': {'videoId': video_id, 'videoPublishedAt': self.youtube.videos[video_id].get('published_at', '')},
+                }
+                for video_id in items
+            ],
+        }
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+    # Transcript endpoints, in the shape youtube_transcript_api parses
+    def handle_watch(self, query):
+        failed, throttled = self.youtube.simulate_network('watch')
+        if failed:
+            self.send_text(500, "Internal Server Error", 'text/plain')
+            return
+        if throttled:
+            # YouTube answers bots with a captcha page, which the library reports as TooManyRequests
+            self.send_text(200, '<html><body><div class="g-recaptcha"></div></body></html>', 'text/html')
+            return
+
+        video_id = query.get('v', '')
+        video = self.youtube.videos.get(video_id)
+        if video is None:
+            self.send_text(200, "<html><body>Video unavailable</body></html>", 'text/html')
+            return
+        player = '"playabilityStatus":{"status":"OK"}'
+        if video.get('tracks'):
+            captions = {'playerCaptionsTracklistRenderer': {
+                'captionTracks': [
+                    dict({
+                        'baseUrl': f"{self.server_url}/timedtext?" + urlencode(
+                            {'v': video_id, 'lang': track['language_code'], **({'kind': 'asr'} if track.get('generated') else {})}
+                        ),
+                        'name': {'simpleText': track.get('name', track['language_code'])},
+                        'languageCode': track['language_code'],
+                        'isTranslatable': True,
+                    }, **({'kind': 'asr'} if track.get('generated') else {}))
+                    for track in video['tracks']
+                ],
+                'translationLanguages': [
+                    {'languageCode': code, 'languageName': {'simpleText': name}}
+                    for code, name in TRANSLATION_LANGUAGES.items()
+                ],
+            }}
+            player += ',"captions":' + json.dumps(captions)
+        html = f'<html><body><script>var ytInitialPlayerResponse = {{{player},"videoDetails":{{"videoId":"{video_id}"}}}};</script></body></html>'
+        self.send_text(200, html, 'text/html')
+
+    def handle_timedtext(self, query):
+        failed, throttled = self.youtube.simulate_network('timedtext')
+        if failed or throttled:
+            self.send_text(429 if throttled else 500, "Error", 'text/plain')
+            return
+
+        video = self.youtube.videos.get(query.get('v', ''), {})
+        generated = query.get('kind') == 'asr'
+        track = next((
+            track for track in video.get('tracks', [])
+            if track['language_code'] == query.get('lang') and bool(track.get('generated')) == generated
+        ), None)
+        if track is None:
+            self.send_text(404, "Not found", 'text/plain')
+            return
+        prefix = f"[{query['tlang']}] " if 'tlang' in query else ""
+        lines = [
+            f'<text start="{segment["start"]}" dur="{segment.get("duration", 0)}">{escape(prefix + segment["text"])}</text>'
+            for segment in track['segments']
+        ]
+        self.send_text(200, '<?xml version="1.0" encoding="utf-8" ?><transcript>' + ''.join(lines) + '</transcript>', 'text/xml')
+
+
+def serve(youtube, host, port):
+    handler = type('Handler', (FakeYouTubeHandler,), {'youtube': youtube, 'server_url': f"http://{host}:{port}"})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fake YouTube Data API and caption responses from fixtures")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_PATH, help=f"fixture file (default: {FIXTURES_PATH})")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate N videos per curated channel instead of reading fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in seconds (±50%% jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a server error")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of caption requests answered as throttled")
+    parser.add_argument("--quota", type=int, default=quota.DAILY_BUDGET, help="Data API units per key before quotaExceeded")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible failures")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fixtures = synthetic_fixtures(args.synthetic) if args.synthetic else load_fixtures(args.fixtures)
+    youtube = FakeYouTube(fixtures, args.latency, args.error_rate, args.throttle_rate, args.quota, args.seed)
+    server = serve(youtube, args.host, args.port)
+    logger.info(f"Fake YouTube serving {len(youtube.videos)} videos in {len(youtube.channels)} channels "
+                f"on http://{args.host}:{args.port} (set YOUTUBE_FAKE_SERVER to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from youtube_transcript_api._errors import (
+    TranscriptsDisabled, NoTranscriptAvailable, NoTranscriptFound, VideoUnavailable, TooManyRequests
+)
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Central scheduler for every YouTubeTranscriptApi call: a token-bucket rate limit shared
+# by all sessions, jittered exponential backoff on transient errors, and a per-video
+# circuit breaker so one broken video is not hammered on every rerun.
+RATE = float(os.environ.get("TRANSCRIPT_RATE", 5))             # requests per second
+BURST = int(os.environ.get("TRANSCRIPT_BURST", 10))            # bucket capacity
+MAX_RETRIES = int(os.environ.get("TRANSCRIPT_MAX_RETRIES", 3))
+BACKOFF_BASE = float(os.environ.get("TRANSCRIPT_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.environ.get("TRANSCRIPT_BACKOFF_MAX", 30.0))
+BREAKER_THRESHOLD = int(os.environ.get("TRANSCRIPT_BREAKER_THRESHOLD", 3))
+BREAKER_COOLDOWN = float(os.environ.get("TRANSCRIPT_BREAKER_COOLDOWN", 300))
+
+# Failure reasons
+DISABLED = 'disabled'            # captions turned off by the uploader
+NOT_FOUND = 'not_found'          # no track in the requested language
+UNAVAILABLE = 'unavailable'      # video removed or private
+THROTTLED = 'throttled'          # YouTube answered 429 on every attempt
+CIRCUIT_OPEN = 'circuit_open'    # recent repeated failures; not tried
+ERROR = 'error'                  # anything else, after retries
+
+# Errors that will not go away by retrying
+PERMANENT_ERRORS = {
+    TranscriptsDisabled: DISABLED,
+    NoTranscriptAvailable: NOT_FOUND,
+    NoTranscriptFound: NOT_FOUND,
+    VideoUnavailable: UNAVAILABLE,
+}
+
+FetchResult = namedtuple('FetchResult', ['ok', 'value', 'reason', 'message', 'attempts'])
+
+
+class TranscriptFetchError(Exception):
+    """A transcript request that failed for a reason other than missing captions"""
+
+    def __init__(self, result):
+        super().__init__(f"{result.reason}: {result.message}")
+        self.reason = result.reason
+        self.result = result
+
+
+class TokenBucket:
+    """Blocking token bucket: at most rate calls per second on average, bursts up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchScheduler:
+    def __init__(self, rate=RATE, burst=BURST, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, breaker_threshold=BREAKER_THRESHOLD, breaker_cooldown=BREAKER_COOLDOWN):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._failures = {}  # video_id -> (consecutive failures, opened_at)
+        self._lock = threading.Lock()
+
+    def _circuit_open(self, video_id):
+        with self._lock:
+            failures, opened_at = self._failures.get(video_id, (0, None))
+            if opened_at is None:
+                return False
+            if time.monotonic() - opened_at >= self.breaker_cooldown:
+                # Half-open: let one call through; a failure re-opens the circuit
+                self._failures[video_id] = (self.breaker_threshold - 1, None)
+                return False
+            return True
+
+    def _record(self, video_id, ok):
+        with self._lock:
+            if ok:
+                self._failures.pop(video_id, None)
+                return
+            failures = self._failures.get(video_id, (0, None))[0] + 1
+            opened_at = time.monotonic() if failures >= self.breaker_threshold else None
+            if opened_at:
+                logger.warning(f"Circuit opened for video {video_id} after {failures} failed requests")
+            self._failures[video_id] = (failures, opened_at)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay before retry number attempt (1-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def call(self, video_id, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) for video_id under the rate limit, retries and circuit breaker"""
+        if self._circuit_open(video_id):
+            return FetchResult(False, None, CIRCUIT_OPEN, "Too many recent failures for this video", 0)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.bucket.acquire()
+            try:
+                value = fn(*args, **kwargs)
+            except tuple(PERMANENT_ERRORS) as e:
+                # The video answered; it just has no such captions
+                self._record(video_id, True)
+                reason = next(reason for error, reason in PERMANENT_ERRORS.items() if isinstance(e, error))
+                return FetchResult(False, None, reason, str(e), attempt)
+            except Exception as e:
+                reason = THROTTLED if isinstance(e, TooManyRequests) else ERROR
+                if attempt > self.max_retries:
+                    self._record(video_id, False)
+                    return FetchResult(False, None, reason, str(e), attempt)
+                delay = self.backoff(attempt)
+                logger.info(f"Retrying request for video {video_id} in {delay:.1f}s ({reason}: {e})")
+                time.sleep(delay)
+                continue
+
+            self._record(video_id, True)
+            return FetchResult(True, value, None, None, attempt)
+
+
+# One scheduler per process, shared by all sessions and both pages
+scheduler = FetchScheduler()
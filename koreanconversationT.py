@@ -4,7 +4,10 @@ import datetime
 import os
 import gspread
 from google.oauth2.service_account import Credentials
+import profiling
 
+# Opt-in timing of this page's hot sections (set APP_PROFILING=1)
+profiling.start("conversation_table")
 
 # Custom CSS for styling
 st.markdown(
@@ -61,6 +64,49 @@ if os.path.exists(csv_file_path):
 else:
     reservation_data = pd.DataFrame(columns=["Book", "Reserved By", "Day"])
 
+# Define the correct Google Sheets scopes
+SCOPE = ["https://spreadsheets.google.com/feeds", 'https://www.googleapis.com/auth/spreadsheets',
+        "https://www.googleapis.com/auth/drive.file", "https://www.googleapis.com/auth/drive"]
+
+# Google Sheet ID (get it from the URL of your Google Sheet)
+spreadsheet_id = '1uUZAt-s-P6fBza2sbwEuAn63I10bCZQbi5hHQuKZP30'
+sheet_name = 'F24'  # Update with your Google Sheet tab name
+
+RESERVATION_COLUMNS = ["Book", "Reserved By", "Day"]
+
+# How long (seconds) the reservations read from the sheet are reused before reading it again
+RESERVATIONS_TTL = 30
+
+# Authorized worksheet handle, created once and shared by all sessions
+@st.cache_resource
+def get_reservation_sheet():
+    profiling.cache_miss("reservation_sheet")
+    # Load Google service account credentials from Streamlit secrets
+    credentials = Credentials.from_service_account_info(st.secrets["google_service_account"], scopes=SCOPE)
+    client = gspread.authorize(credentials)
+    return client.open_by_key(spreadsheet_id).worksheet(sheet_name)
+
+# Read the reservations from Google Sheets into a DataFrame (cached briefly; cleared after each reservation)
+@st.cache_data(ttl=RESERVATIONS_TTL, show_spinner=False)
+def load_reservations():
+    profiling.cache_miss("get_all_records")
+    reservations = pd.DataFrame(get_reservation_sheet().get_all_records())
+    # Ensure the DataFrame has the correct columns if it's empty
+    if reservations.empty:
+        reservations = pd.DataFrame(columns=RESERVATION_COLUMNS)
+    return reservations
+
+# Add one reservation as a new row at the end of the sheet. Appending never rewrites
+# existing rows, so reservations made at the same time by other users are kept.
+def append_reservation(book, name, day):
+    sheet = get_reservation_sheet()
+    if load_reservations().empty and not sheet.row_values(1):
+        # Empty sheet: write the header row first so get_all_records can read it
+        sheet.append_row(RESERVATION_COLUMNS, table_range="A1")
+    # Values are written RAW (the default), so a typed name is never parsed as a formula or number
+    sheet.append_row([book, name, day], table_range="A1")
+    load_reservations.clear()
+
 
 # Title 
 st.markdown('<h1 class="title">Korean Conversation Table</h1>', unsafe_allow_html=True)
@@ -116,36 +162,9 @@ with tab1:
 
 with tab2:
 
-    # Define the correct Google Sheets scopes
-   
-
-
-    SCOPE = ["https://spreadsheets.google.com/feeds", 'https://www.googleapis.com/auth/spreadsheets',
-            "https://www.googleapis.com/auth/drive.file", "https://www.googleapis.com/auth/drive"]
-
-
-    # Load Google service account credentials from Streamlit secrets
-    credentials_dict = st.secrets["google_service_account"]
-    credentials = Credentials.from_service_account_info(credentials_dict, scopes=SCOPE)
-
-    # Authorize the client
-    client = gspread.authorize(credentials)
-
-
-    # Google Sheet ID (get it from the URL of your Google Sheet)
-    spreadsheet_id = '1uUZAt-s-P6fBza2sbwEuAn63I10bCZQbi5hHQuKZP30'
-    sheet_name = 'F24'  # Update with your Google Sheet tab name
-
-    # Open the Google Sheet
-    sheet = client.open_by_key(spreadsheet_id).worksheet(sheet_name)
-
-    # Read data from Google Sheets into a DataFrame
-    data = sheet.get_all_records()
-    reservation_data = pd.DataFrame(data)
-
-    # Ensure the DataFrame has the correct columns if it's empty
-    if reservation_data.empty:
-        reservation_data = pd.DataFrame(columns=["Book", "Reserved By", "Day"])
+    # Current reservations (the sheet is only read again after the TTL or a new reservation)
+    with profiling.span("get_all_records", cached=True):
+        reservation_data = load_reservations()
 
     # Center the text and change the font size
     st.markdown(
@@ -183,12 +202,9 @@ with tab2:
     # Reserve button
     if st.button("Reserve"):
         if reserver_name:
-            # Add the new reservation to the DataFrame
-            new_reservation = pd.DataFrame({"Book": [selected_book], "Reserved By": [reserver_name], "Day": [selected_day]})
-            reservation_data = pd.concat([reservation_data, new_reservation], ignore_index=True)
-            
-            # Update Google Sheet with new data
-            sheet.update([reservation_data.columns.values.tolist()] + reservation_data.values.tolist())
+            # Append the new reservation to the Google Sheet
+            with profiling.span("sheets_write"):
+                append_reservation(selected_book, reserver_name, selected_day)
             st.success(f"Reserved {selected_book} for {reserver_name}")
         else:
             st.error("Please enter your name")
@@ -198,3 +214,4 @@ with tab2:
     #st.dataframe(reservation_data)
     
 
+profiling.finish()
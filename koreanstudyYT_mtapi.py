@@ -1,18 +1,33 @@
 import streamlit as st
 import pandas as pd
-from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptAvailable, NoTranscriptFound
 from googleapiclient.errors import HttpError
-from googletrans import Translator
 import os
 import re
+import time
+import hashlib
+from collections import Counter
+from bisect import bisect_left, bisect_right
+import transcript_store
+import transcript_fetcher
+from fetch_scheduler import TranscriptFetchError
+import video_catalog
+from youtube_endpoints import build_youtube
+import quota
+import caption_corpus
+import translation
+import profiling
+from caption_index import CaptionIndex
+from caption_search import parse_terms, search_transcript_terms, TranscriptBuffer
+from transcript_align import align_transcripts
 
 # Set up logging
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Opt-in timing of this page's hot sections (set APP_PROFILING=1)
+profiling.start("caption_search")
+
 # Custom CSS to center the title
 st.markdown("""
 <style>
@@ -42,6 +57,7 @@ st.markdown("""
 # Load CSV data for Quizlet
 @st.cache_data
 def load_csv_data():
+    profiling.cache_miss("load_csv_data")
     try:
         df = pd.read_csv('data/fcstr1.csv')
         lesson_list = df['lesson'].unique().tolist()      
@@ -50,7 +66,8 @@ def load_csv_data():
         st.error(f"Error loading CSV file: {e}")
         return None, []
 
-df, lesson_list = load_csv_data()
+with profiling.span("load_csv_data", cached=True):
+    df, lesson_list = load_csv_data()
 
 # Function to retrieve Quizlet links for selected lessons
 def get_lesson_link(lesson):
@@ -74,55 +91,140 @@ def extract_video_id(url):
     except:
         return url
 
-# Initialize Google Translator
-translator = Translator()
+# Non-blocking translation pipeline shared by all sessions (backend set by TRANSLATION_BACKEND)
+@st.cache_resource
+def get_translation_pipeline():
+    return translation.TranslationPipeline(translation.get_backend())
+
+# Offline corpus built by build_corpus.py, memory-mapped read-only and shared by all sessions.
+# Cached by the file's modification time, so a rebuilt corpus is picked up without a restart.
+@st.cache_resource(max_entries=1)
+def load_caption_corpus(version):
+    return caption_corpus.load_corpus()
+
+def get_caption_corpus():
+    return load_caption_corpus(caption_corpus.corpus_version())
 
 @st.cache_data(ttl=86400)
 def get_caption_with_timestamps(video_id):
+    profiling.cache_miss("transcript")
+    # Curated videos in the offline corpus never touch YouTube
+    corpus = get_caption_corpus()
+    if corpus is not None and corpus.has_transcript(video_id, 'ko'):
+        return corpus.get_transcript(video_id, 'ko')
+    
+    # Served from the persistent store first so restarts don't go back to YouTube.
+    # Only "no captions" comes back as None; throttling and other failures raise
+    # TranscriptFetchError, which st.cache_data does not cache, so they are retried.
+    return transcript_fetcher.get_transcript(video_id, 'ko')
+
+# Start translating sentences without waiting: {text: future}. Each sentence counts
+# towards the cache hit rate once per search, not again on every rerun of the page.
+def translate_texts(texts):
+    counted = st.session_state.setdefault('counted_translations', set())
+    new_texts = [text for text in texts if text not in counted]
+    counted.update(new_texts)
+    pipeline = get_translation_pipeline()
+    pending = pipeline.submit([text for text in texts if text not in new_texts], count=False)
+    pending.update(pipeline.submit(new_texts))
+    return pending
+
+# English subtitles of a video and the layout of its Korean captions (segment times and
+# sentence ranges, as the search results use them), memoized per video. English is read
+# only from the offline corpus or the transcript store, never fetched from YouTube on user
+# traffic; None when the video has no stored English track.
+@st.cache_data(ttl=3600)
+def get_video_subtitles(video_id):
+    profiling.cache_miss("english_subtitles")
+    corpus = get_caption_corpus()
+    if corpus is not None and corpus.has_transcript(video_id, 'en'):
+        english = corpus.get_transcript(video_id, 'en')
+    else:
+        _, english = transcript_store.load_transcript(video_id, 'en')
+    if not english:
+        return None
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko'])
-        return transcript
-    except (TranscriptsDisabled, NoTranscriptAvailable, NoTranscriptFound):
+        korean = get_caption_with_timestamps(video_id)
+    except TranscriptFetchError as e:
+        logger.warning(f"Korean captions not available for video {video_id}: {e}")
         return None
-    except Exception as e:
-        st.warning(f"Captions not available for video {video_id}: {str(e)}")
+    if not korean:
         return None
+    buffer = TranscriptBuffer(korean)
+    return {
+        'english': english,
+        'starts': list(buffer.starts),
+        'ends': [entry['start'] + entry.get('duration', 0) for entry in korean],
+        'offsets': list(buffer.offsets),
+        'sentence_first': list(buffer.sentence_first),
+    }
 
-def search_caption_with_context(transcript, query):
-    matches = []
-    for i, entry in enumerate(transcript):
-        if query.lower() in entry['text'].lower():
-            # Collect the surrounding context to form a full sentence
-            start = i  
-            end = min(len(transcript), i + 1)  # Include the next sentence if available
-            context = transcript[start:end]
-            full_sentence = ' '.join([item['text'] for item in context])
-            start_time = context[0]['start']
-            matches.append((start_time, full_sentence))
-    return matches
-
-def translate_text(text):
-    try:
-        return translator.translate(text, src='ko', dest='en').text
-    except Exception as e:
-        st.warning(f"Translation failed: {str(e)}")
-        return "Translation not available"
+# Time span of the Korean text shown for a match: from the start of the match's sentence
+# to the end of the last segment the shown text covers
+def match_window(layout, start_time, text):
+    first = bisect_left(layout['starts'], start_time)
+    if first >= len(layout['starts']) or layout['starts'][first] != start_time:
+        return None
+    sentence_first = layout['sentence_first'][first]
+    last = bisect_right(layout['offsets'], layout['offsets'][sentence_first] + max(len(text) - 1, 0)) - 1
+    return layout['starts'][sentence_first], max(layout['ends'][sentence_first:last + 1])
+
+# English subtitles for the matches on a page: {(video_id, start, text): english text}, with
+# every English segment that overlaps the shown Korean sentences joined together.
+# Matches of videos without stored English subtitles are left out.
+def get_subtitle_translations(page_rows):
+    windows = {}
+    for video, start_time, text, _ in page_rows:
+        windows.setdefault(video['video_id'], []).append((start_time, text))
+    subtitles = {}
+    for video_id, matches in windows.items():
+        with profiling.span("english_subtitles", cached=True):
+            layout = get_video_subtitles(video_id)
+        if layout is None:
+            continue
+        shown = []
+        for start_time, text in matches:
+            window = match_window(layout, start_time, text)
+            if window is not None:
+                shown.append(((start_time, text), window))
+        aligned = align_transcripts(
+            [{'text': '', 'start': begin, 'duration': end - begin} for _, (begin, end) in shown],
+            layout['english']
+        )
+        for (key, _), english_text in zip(shown, aligned):
+            if english_text:
+                subtitles[(video_id,) + key] = english_text
+    return subtitles
+
+# Fill in translation placeholders as their translations arrive
+def fill_translations(placeholders, pending):
+    by_text = {}
+    for text, placeholder in placeholders:
+        by_text.setdefault(text, []).append(placeholder)
+    
+    pipeline = get_translation_pipeline()
+    waiting = {text: pending[text] for text in by_text if text in pending}
+    for text, english_translation in pipeline.iter_completed(waiting):
+        for placeholder in by_text[text]:
+            placeholder.write(f"Translation: {english_translation or 'Translation not available'}")
+    for text in by_text:
+        if text not in pending:
+            for placeholder in by_text[text]:
+                placeholder.write("Translation: Translation not available")
 
 @st.cache_data(ttl=3600)
 def get_channel_videos(channel_id):
+    # Delta-sync the persistent channel catalog (full crawl on first use), then serve from it
     try:
-        request = youtube.search().list(
-            part="id,snippet",
-            channelId=channel_id,
-            maxResults=50,  # Get maximum results per request
-            order="viewCount",
-            type="video"
-        )
-        response = request.execute()
-        return response['items']  # Return all items
-    except HttpError as e:
-        logger.error(f"Error fetching videos: {str(e)}")
-        return []
+        video_catalog.sync_channel(youtube, channel_id)
+    except quota.QuotaExceeded as e:
+        logger.warning(f"Serving cached videos for channel {channel_id}: {str(e)}")
+    except (HttpError, ValueError) as e:
+        logger.error(f"Error syncing videos for channel {channel_id}: {str(e)}")
+    return video_catalog.load_channel_videos(channel_id)
+
+# Number of most-viewed catalog videos whose counts are refreshed in search_videos (one videos.list page)
+RANKING_CANDIDATES = 50
 
 @st.cache_data(ttl=3600)
 def search_videos(query, channel_id):
@@ -131,25 +233,208 @@ def search_videos(query, channel_id):
         st.error("YouTube search is currently unavailable. Please try again later.")
         return []
 
-    all_videos = get_channel_videos(channel_id)  # Get all videos
+    # The catalog stores view counts from the sync, so the whole channel is ranked without
+    # API calls; only the most viewed candidates get fresh counts, in one videos.list call
+    get_channel_videos(channel_id)
+    all_videos = video_catalog.load_most_viewed_videos(channel_id, RANKING_CANDIDATES)
+    if not all_videos:
+        return []
+    
+    # Sort the candidates by their current view count
+    video_ids = [item['id']['videoId'] for item in all_videos]
+    statistics = get_videos_statistics(video_ids)
+    view_counts = pd.to_numeric(
+        pd.Series([statistics[video_id].get('viewCount', 0) for video_id in video_ids]),
+        errors='coerce'
+    ).fillna(0)
     
-    # Sort all videos by view count
-    all_videos.sort(key=lambda x: int(get_video_details(x['id']['videoId'])['viewCount']), reverse=True)
+    return [all_videos[i] for i in view_counts.nlargest(5).index]  # Return top 5 here
+
+# Per-video statistics shared across sessions: video_id -> (fetched_at, statistics)
+STATISTICS_TTL = 86400
+
+@st.cache_resource
+def get_statistics_cache():
+    return {}
+
+def get_videos_statistics(video_ids):
+    cache = get_statistics_cache()
+    now = time.time()
+    missing = [
+        video_id for video_id in dict.fromkeys(video_ids)
+        if video_id not in cache or now - cache[video_id][0] > STATISTICS_TTL
+    ]
     
-    return all_videos[:5]  # Return top 5 here
+    # videos.list accepts up to 50 comma-separated ids per request
+    for i in range(0, len(missing), 50):
+        batch = missing[i:i + 50]
+        try:
+            request = youtube.videos().list(
+                part="statistics",
+                id=",".join(batch),
+                maxResults=50
+            )
+            response = request.execute()
+            for item in response['items']:
+                cache[item['id']] = (now, item['statistics'])
+        except quota.QuotaExceeded as e:
+            # Fall back to whatever statistics are cached, even if stale
+            logger.warning(f"Using cached video statistics: {str(e)}")
+            break
+        except HttpError as e:
+            st.error(f"An error occurred while fetching video statistics: {str(e)}")
+    
+    return {
+        video_id: cache[video_id][1] if video_id in cache else {'viewCount': '0'}
+        for video_id in video_ids
+    }
 
-@st.cache_data(ttl=86400)
 def get_video_details(video_id):
+    return get_videos_statistics([video_id])[video_id]
+
+# Whether an HttpError means the API key itself was rejected (rather than an outage or quota)
+def is_invalid_key_error(e):
+    details = e.error_details if isinstance(e.error_details, list) else []
+    return e.resp.status == 400 or any(
+        isinstance(detail, dict) and detail.get('reason') == 'keyInvalid' for detail in details
+    )
+
+# API key validation, run once per key (cached by the key's hash) and repeated after an hour.
+# Returns False for a rejected key; any other error is raised, so it is not cached.
+@st.cache_data(ttl=3600)
+def validate_api_key(api_key_hash, _api_key):
+    profiling.cache_miss("youtube_client")
+    client = quota.QuotaTrackedClient(build_youtube(_api_key), api_key_hash)
     try:
-        request = youtube.videos().list(
-            part="statistics",
-            id=video_id
-        )
-        response = request.execute()
-        return response['items'][0]['statistics']
+        client.videos().list(part="snippet", id="dQw4w9WgXcQ").execute()
+    except quota.QuotaExceeded as e:
+        # The key was already used today, so skip the test call rather than spend budget on it
+        logger.warning(f"Skipping YouTube API key validation: {e}")
     except HttpError as e:
-        st.error(f"An error occurred while fetching details for video {video_id}: {str(e)}")
-        return {'viewCount': '0'}
+        if not is_invalid_key_error(e):
+            raise
+        logger.error(f"YouTube API key validation failed: {e}")
+        return False
+    logger.info("YouTube API key validated")
+    return True
+
+# YouTube client for this session. googleapiclient's httplib2 connection is not thread-safe,
+# so each session builds its own client instead of sharing one across sessions.
+# Returns None for a rejected key. Every call made through the client is budgeted and
+# recorded by the quota module.
+def get_youtube_client(api_key_hash, api_key):
+    if not validate_api_key(api_key_hash, api_key):
+        return None
+    cached = st.session_state.get('youtube_client')
+    if cached and cached[0] == api_key_hash:
+        return cached[1]
+    client = quota.QuotaTrackedClient(build_youtube(api_key), api_key_hash)
+    st.session_state.youtube_client = (api_key_hash, client)
+    logger.info("YouTube API initialized successfully")
+    return client
+
+# Function to display today's quota usage for an API key, with an exportable report
+def display_quota_panel(api_key_hash):
+    with st.expander("API quota usage"):
+        used = quota.units_used(api_key_hash)
+        st.progress(min(used / quota.DAILY_BUDGET, 1.0), text=f"{used} / {quota.DAILY_BUDGET} units used today")
+        
+        today = quota.usage_report(api_key_hash, quota.quota_day())
+        if today:
+            st.dataframe(pd.DataFrame(today).drop(columns=['key_hash']), use_container_width=True)
+        else:
+            st.write("No API calls recorded today.")
+        
+        report = pd.DataFrame(quota.usage_report(api_key_hash))
+        st.download_button(
+            label="Download usage report",
+            data=report.to_csv(index=False).encode('utf-8'),
+            file_name=f"youtube_quota_{quota.quota_day()}.csv",
+            mime="text/csv",
+            key="download_quota_report"
+        )
+
+# Curated channels for "Search by Channel"
+channel_options = video_catalog.CURATED_CHANNELS
+
+# Inverted bigram index over the cached transcripts of one channel, shared across sessions
+# and rebuilt when the corpus changes (corpus_version)
+@st.cache_resource
+def get_caption_index(channel_id, corpus_version=None):
+    index = CaptionIndex()
+    # Seed from the offline corpus, then from transcripts in the persistent store (no network calls)
+    corpus = get_caption_corpus()
+    if corpus is not None:
+        for video_id in corpus.channel_video_ids(channel_id, 'ko'):
+            index.add_transcript(video_id, corpus.get_transcript(video_id, 'ko'))
+    for item in get_channel_videos(channel_id):
+        video_id = item['id']['videoId']
+        if video_id in index:
+            continue
+        found, transcript = transcript_store.load_transcript(video_id, 'ko')
+        if found and transcript:
+            index.add_transcript(video_id, transcript)
+    logger.info(f"Caption index for channel {channel_id} built with {len(index)} videos")
+    return index
+
+# Streaming channel search: yields (video, matches, videos done, videos total) as each video
+# is matched; video is None for videos without matches. Stops once max_matches is reached,
+# which cancels the transcript fetches that have not started yet. Several terms are
+# matched together in one pass per video; each match is (start, text, term).
+def stream_channel_matches(channel_id, query, terms, max_matches=0):
+    results = search_videos(query, channel_id)
+    index = get_caption_index(channel_id, caption_corpus.corpus_version())
+    
+    # Top videos first, then every other indexed video of the channel
+    channel_videos = {item['id']['videoId']: item for item in results}
+    for item in get_channel_videos(channel_id):
+        channel_videos.setdefault(item['id']['videoId'], item)
+    
+    def result(video_id, matches):
+        item = channel_videos[video_id]
+        return {
+            'video_id': video_id,
+            'title': item['snippet']['title'],
+            'channel_title': item['snippet']['channelTitle'],
+            'matches': matches
+        }
+    
+    indexed = [video_id for video_id in channel_videos if video_id in index]
+    to_fetch = [item['id']['videoId'] for item in results if item['id']['videoId'] not in index]
+    total = len(indexed) + len(to_fetch)
+    done = 0
+    total_matches = 0
+    
+    # Videos that are already indexed are answered by the index right away
+    all_matches, _ = index.search_terms(terms, indexed)
+    for video_id in indexed:
+        done += 1
+        matches = all_matches.get(video_id)
+        if not matches:
+            yield None, [], done, total
+            continue
+        yield result(video_id, matches), matches, done, total
+        total_matches += len(matches)
+        if max_matches and total_matches >= max_matches:
+            return
+    
+    # The rest are fetched in parallel and matched as each transcript arrives
+    for video_id, transcript, error in transcript_fetcher.iter_transcripts(to_fetch, 'ko'):
+        done += 1
+        if error:
+            st.warning(f"Captions not available for video {video_id}: {error}")
+        if not transcript:
+            yield None, [], done, total
+            continue
+        index.add_transcript(video_id, transcript)
+        matches, _ = search_transcript_terms(transcript, terms)
+        if not matches:
+            yield None, [], done, total
+            continue
+        yield result(video_id, matches), matches, done, total
+        total_matches += len(matches)
+        if max_matches and total_matches >= max_matches:
+            return
 
 # Function to format time from seconds to HH:MM:SS
 def format_time(seconds):
@@ -187,16 +472,104 @@ def embed_youtube_video(video_id, start_time_seconds):
     
     st.markdown(video_html, unsafe_allow_html=True)
 
-# Function to display video segments with multiple timestamps using HTML iframe
-def display_video_segments(video_id, matches):
-    for start_time, text in matches:
-        formatted_time = format_time(start_time)
-        english_translation = translate_text(text)
-        st.write(f"**[{formatted_time}]** {text}")
-        st.write(f"Translation: {english_translation}")
-        
+# Lightweight stand-in for the player: just the video thumbnail, no iframe
+def embed_youtube_thumbnail(video_id):
+    st.markdown(f"""
+    <img src="https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+         style="width: 320px; max-width: 100%; border-radius: 8px; margin-bottom: 5px;">
+    """, unsafe_allow_html=True)
+
+def play_match(match_key):
+    st.session_state.active_match = match_key
+
+def set_search_page(page):
+    st.session_state.search_page = page
+
+# Function to display one match. The Korean text renders right away and the real iframe
+# only loads for the match the user picked; returns the placeholder for the English line.
+def display_match(video_id, start_time, text, match_key):
+    formatted_time = format_time(start_time)
+    st.write(f"**[{formatted_time}]** {text}")
+    placeholder = st.empty()
+    placeholder.write("Translation: ⏳ translating...")
+    
+    if st.session_state.get('active_match') == match_key:
         # Embed the video using the HTML iframe method starting at the matched timestamp
         embed_youtube_video(video_id, int(start_time))
+    else:
+        embed_youtube_thumbnail(video_id)
+        st.button(f"▶ Play from {formatted_time}", key=f"play_{match_key}", on_click=play_match, args=(match_key,))
+    return placeholder
+
+# Store search results in session state so paging and playing survive reruns
+def save_search_results(query, terms, videos):
+    st.session_state.search_results = {'query': query, 'terms': terms, 'videos': videos}
+    st.session_state.search_page = 0
+    st.session_state.active_match = None
+    st.session_state.counted_translations = set()
+
+# Options for the number of matches shown per page
+SEARCH_PAGE_SIZES = [5, 10, 20, 50]
+
+# Function to display the stored search results one page at a time
+def display_search_results():
+    results = st.session_state.search_results
+    rows = [
+        (video, start_time, text, term)
+        for video in results['videos']
+        for start_time, text, term in video['matches']
+    ]
+    if not rows:
+        return
+    
+    terms = results['terms']
+    if len(terms) > 1:
+        counts = Counter(term for _, _, _, term in rows)
+        st.caption(" · ".join(f"**{term}** {counts[term]}" for term in terms))
+    
+    page_size = st.selectbox("Matches per page", SEARCH_PAGE_SIZES, key="search_page_size")
+    page_count = (len(rows) + page_size - 1) // page_size
+    page = min(st.session_state.get('search_page', 0), page_count - 1)
+    st.caption(f"{len(rows)} matches in {len(results['videos'])} videos · page {page + 1} of {page_count}")
+    
+    # Only the current page is translated and rendered. Real English subtitles are used
+    # where the video has them; the rest goes to the translation backend.
+    first = page * page_size
+    page_rows = rows[first:first + page_size]
+    subtitles = get_subtitle_translations(page_rows)
+    pending = translate_texts([
+        text for video, start_time, text, _ in page_rows
+        if (video['video_id'], start_time, text) not in subtitles
+    ])
+    placeholders = []
+    current_video = None
+    for n, (video, start_time, text, term) in enumerate(page_rows, start=first):
+        if video is not current_video:
+            current_video = video
+            if video['title'] is None:
+                st.write(f"### Matches found for '{results['query']}' in the video:")
+            else:
+                st.write(f"### {video['title']}")
+                st.write(f"Channel: {video['channel_title']}")
+        if len(terms) > 1:
+            st.caption(f"Grammar point: {term}")
+        placeholder = display_match(video['video_id'], start_time, text, f"{video['video_id']}_{n}")
+        subtitle = subtitles.get((video['video_id'], start_time, text))
+        if subtitle:
+            placeholder.write(f"Translation (English subtitles): {subtitle}")
+        else:
+            placeholders.append((text, placeholder))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("◀ Previous", key="search_prev", disabled=page == 0, on_click=set_search_page, args=(page - 1,))
+    with col2:
+        st.button("Next ▶", key="search_next", disabled=page >= page_count - 1, on_click=set_search_page, args=(page + 1,))
+    
+    with profiling.span("translations"):
+        fill_translations(placeholders, pending)
+    stats = translation.get_cache_stats()
+    st.caption(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
 
 # Streamlit app setup with tabs for different sections
 st.markdown("<h1 class='title' style='text-align: center; font-size: 38px; margin-bottom: -10px;'>한국어 단어와 문법</h1>", unsafe_allow_html=True)
@@ -263,48 +636,68 @@ with tab3:
         st.warning("Please enter your API key to use this feature.")
         st.stop()
         
+    api_key_hash = hashlib.sha256(user_api_key.encode('utf-8')).hexdigest()
     try:
-        youtube = build('youtube', 'v3', developerKey=user_api_key)
-        test = youtube.videos().list(part="snippet", id="dQw4w9WgXcQ").execute()
-        logger.info("YouTube API initialized successfully")
+        with profiling.span("youtube_client", cached=True):
+            youtube = get_youtube_client(api_key_hash, user_api_key)
     except Exception as e:
+        logger.error(f"Error initializing YouTube API: {e}")
+        st.error(f"Could not reach the YouTube API right now. Please try again later. ({e})")
+        st.stop()
+    if youtube is None:
         st.error("Invalid API key. Please check and try again.")
         st.stop()
 
+    display_quota_panel(api_key_hash)
+
     # Search methods
     search_method = st.radio(
         "Choose search method:",
         ["Search by Video Link", "Search by Channel"]
     )
 
-    search_term = st.text_input("Enter a Korean grammar point or phrase:", key="search_term_tab2")
+    multiple_terms = st.checkbox(
+        "Search several grammar points at once",
+        key="multiple_terms_tab2",
+        help="Separate the grammar points with commas, e.g. -는데, -거든요, -잖아요"
+    )
+    search_term = st.text_input(
+        "Enter a Korean grammar point or phrase:",
+        key="search_term_tab2"
+    )
+    search_terms = parse_terms(search_term, multiple_terms)
 
     if search_method == "Search by Channel":
-        channel_options = {
-            "SBS Running Man": "UCaKod3X1Tn4c7Ci0iUKcvzQ",
-            "DdeunDdeun": "UCDNvRZRgvkBTUkQzFoT_8rA", 
-            "channel fullmoon" : "UCQ2O-iftmnlfrBuNsUUTofQ",
-        }
         selected_channel = st.selectbox("Select Channel", options=list(channel_options.keys()))
 
+        max_matches = st.number_input("Stop after this many matches (0 = no limit)", min_value=0, value=0, step=10)
+
         if st.button("Search in Channel", key="channel_search"):
             if youtube and search_term:
                 try:
                     channel_id = channel_options[selected_channel]
-                    results = search_videos(search_term, channel_id)
+                    progress_bar = st.progress(0.0, text="Searching...")
+                    live_results = st.empty()
+                    found = []
+                    total_matches = 0
                     
-                    for item in results:
-                        video_id = item['id']['videoId']
-                        title = item['snippet']['title']
-                        channel_title = item['snippet']['channelTitle']
-                        transcript = get_caption_with_timestamps(video_id)
-                        
-                        if transcript:
-                            matches = search_caption_with_context(transcript, search_term)
-                            if matches:
-                                st.write(f"### {title}")
-                                st.write(f"Channel: {channel_title}")
-                                display_video_segments(video_id, matches)
+                    # Show each video's matches as soon as its transcript has been matched
+                    with profiling.span("channel_search"):
+                        for video, matches, done, total in stream_channel_matches(channel_id, search_term, search_terms, max_matches):
+                            total_matches += len(matches)
+                            progress_bar.progress(done / total if total else 1.0, text=f"Searched {done}/{total} videos · {total_matches} matches")
+                            if video is None:
+                                continue
+                            found.append((video, matches))
+                            with live_results.container():
+                                for video_found, matches_found in found:
+                                    st.write(f"✅ **{video_found['title']}** · {len(matches_found)} matches")
+                    
+                    progress_bar.empty()
+                    live_results.empty()
+                    if max_matches and total_matches >= max_matches:
+                        st.info(f"Stopped after {total_matches} matches.")
+                    save_search_results(search_term, search_terms, [video for video, _ in found])
                 
                 except Exception as e:
                     st.error(f"An error occurred: {str(e)}")
@@ -325,25 +718,29 @@ with tab3:
                         st.error("Invalid YouTube URL format")
                         st.stop()
 
-                    transcript = get_caption_with_timestamps(video_id)
+                    try:
+                        with profiling.span("transcript", cached=True):
+                            transcript = get_caption_with_timestamps(video_id)
+                    except TranscriptFetchError as e:
+                        st.warning(f"Captions not available for video {video_id}: {str(e)}")
+                        transcript = None
                     if transcript:
-                        matches = search_caption_with_context(transcript, search_term)
+                        matches, _ = search_transcript_terms(transcript, search_terms)
                         if matches:
-                            st.write(f"### Matches found for '{search_term}' in the video:")
-                            display_video_segments(video_id, matches)
+                            save_search_results(search_term, search_terms, [
+                                {'video_id': video_id, 'title': None, 'channel_title': None, 'matches': matches}
+                            ])
                         else:
+                            save_search_results(search_term, search_terms, [])
                             st.write("No matching captions found.")
                 except Exception as e:
                     st.error(f"An error occurred: {str(e)}")
             else:
                 st.write("Please enter both a YouTube link and a search term.")
 
+    # Show the stored results of the last search (paged, players load on demand)
+    if st.session_state.get('search_results'):
+        with profiling.span("search_results"):
+            display_search_results()
 
-
-
-
-
-
-
-
-
+profiling.finish()
@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Opt-in timing of the named hot sections of each page (API client setup, sheet reads,
+# transcript fetches, translations, exports...). Spans are recorded per rerun and kept per
+# session; every session of a page is also registered here so the debug panel can show
+# page-wide numbers. Cached sections count their calls and their cache misses, which gives
+# the cache hit rate. Nothing is recorded unless APP_PROFILING is set.
+ENABLED = os.environ.get("APP_PROFILING", "").lower() in ("1", "true", "yes")
+
+# When set, every finished rerun's spans are also appended to this JSONL file
+LOG_PATH = os.environ.get("APP_PROFILING_LOG")
+
+# Spans kept per session (oldest are dropped first)
+MAX_RECORDS = int(os.environ.get("APP_PROFILING_MAX_RECORDS", 5000))
+
+# Sessions idle for longer than this (seconds) leave the page-wide numbers
+SESSION_IDLE = 3600
+
+_local = threading.local()   # the profiler of the rerun running on this script thread
+_sessions = {}               # (page, session id) -> Profiler
+_sessions_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+class Profiler:
+    """Spans and cache counters of one session on one page"""
+
+    def __init__(self, page, session_id=None):
+        self.page = page
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.records = deque(maxlen=MAX_RECORDS)
+        self.cache_calls = {}
+        self.cache_misses = {}
+        self.rerun = 0
+        self._rerun_started = None
+        self._last_activity = None
+        self._lock = threading.Lock()
+
+    def begin_rerun(self):
+        """Close the previous rerun (it may have ended in st.stop) and start timing a new one"""
+        self.finish_rerun()
+        self.rerun += 1
+        self._rerun_started = self._last_activity = time.time()
+
+    def finish_rerun(self, finished_at=None):
+        """Record the rerun's total time: up to finished_at, or its last recorded activity"""
+        if finished_at is not None and self._rerun_started is not None:
+            self._last_activity = finished_at
+        if self._rerun_started is None:
+            return
+        started, self._rerun_started = self._rerun_started, None
+        record = self._record('rerun', started, self._last_activity - started)
+        if LOG_PATH:
+            self.append_log([r for r in self.records if r['rerun'] == record['rerun']])
+
+    def _record(self, name, started, seconds, **extra):
+        record = {
+            'page': self.page,
+            'session': self.session_id,
+            'rerun': self.rerun,
+            'name': name,
+            'started_at': round(started, 3),
+            'ms': round(seconds * 1000, 2),
+        }
+        record.update(extra)
+        with self._lock:
+            self.records.append(record)
+            self._last_activity = max(self._last_activity or 0, started + seconds)
+        return record
+
+    @contextmanager
+    def span(self, name, cached=False):
+        if cached:
+            with self._lock:
+                self.cache_calls[name] = self.cache_calls.get(name, 0) + 1
+        started = time.time()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            extra = {'error': error} if error else {}
+            self._record(name, started, time.time() - started, **extra)
+
+    def cache_miss(self, name):
+        with self._lock:
+            self.cache_misses[name] = self.cache_misses.get(name, 0) + 1
+
+    def last_rerun(self):
+        """Spans of the most recent finished rerun"""
+        with self._lock:
+            finished = [r['rerun'] for r in self.records if r['name'] == 'rerun']
+            if not finished:
+                return []
+            return [r for r in self.records if r['rerun'] == finished[-1]]
+
+    def append_log(self, records):
+        with _log_lock:
+            folder = os.path.dirname(LOG_PATH)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            with open(LOG_PATH, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def summarize(records):
+    """Per-section count, total, mean and max milliseconds, slowest total first"""
+    sections = {}
+    for record in records:
+        section = sections.setdefault(record['name'], {'section': record['name'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0})
+        section['count'] += 1
+        section['total_ms'] += record['ms']
+        section['max_ms'] = max(section['max_ms'], record['ms'])
+        section['errors'] += 1 if record.get('error') else 0
+    for section in sections.values():
+        section['mean_ms'] = round(section['total_ms'] / section['count'], 2)
+        section['total_ms'] = round(section['total_ms'], 2)
+    return sorted(sections.values(), key=lambda section: -section['total_ms'])
+
+
+def cache_rates(profilers):
+    """{section: (calls, misses, hit rate)} summed over profilers"""
+    calls = {}
+    misses = {}
+    for profiler in profilers:
+        with profiler._lock:
+            for name, count in profiler.cache_calls.items():
+                calls[name] = calls.get(name, 0) + count
+            for name, count in profiler.cache_misses.items():
+                misses[name] = misses.get(name, 0) + count
+    return {
+        name: (count, misses.get(name, 0), max(count - misses.get(name, 0), 0) / count)
+        for name, count in calls.items() if count
+    }
+
+
+def page_profilers(page):
+    with _sessions_lock:
+        return [profiler for (profiler_page, _), profiler in _sessions.items() if profiler_page == page]
+
+
+def export_jsonl(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+
+
+def current():
+    return getattr(_local, 'profiler', None)
+
+
+def span(name, cached=False):
+    """Time a named section of the current rerun (a no-op when profiling is off)"""
+    profiler = current()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, cached)
+
+
+def cache_miss(name):
+    """Call inside a cached function body: the section's cache was missed"""
+    profiler = current()
+    if profiler is not None:
+        profiler.cache_miss(name)
+
+
+def finish():
+    """Call at the end of a page to record the full rerun time (reruns cut short by st.stop fall back to their last span)"""
+    profiler = current()
+    if profiler is not None:
+        profiler.finish_rerun(time.time())
+        _local.profiler = None
+
+
+def start(page):
+    """
+    Call at the top of a page. Starts timing this rerun for the session and shows the
+    debug panel (with the previous, complete rerun) in the sidebar. Returns the session's
+    Profiler, or None when profiling is off.
+    """
+    _local.profiler = None
+    if not ENABLED:
+        return None
+    import streamlit as st
+
+    key = f"profiler_{page}"
+    if key not in st.session_state:
+        st.session_state[key] = Profiler(page)
+    profiler = st.session_state[key]
+    with _sessions_lock:
+        _sessions[(page, profiler.session_id)] = profiler
+        idle = [session_key for session_key, p in _sessions.items() if (p._last_activity or 0) < time.time() - SESSION_IDLE]
+        for idle_key in idle:
+            del _sessions[idle_key]
+    profiler.begin_rerun()
+    _local.profiler = profiler
+    display_panel(profiler)
+    return profiler
+
+
+def display_panel(profiler):
+    import streamlit as st
+    import pandas as pd
+
+    with st.sidebar.expander("🛠 Profiling", expanded=False):
+        last = profiler.last_rerun()
+        if last:
+            st.markdown(f"**Last rerun** (#{last[0]['rerun']})")
+            st.dataframe(pd.DataFrame([{'section': r['name'], 'ms': r['ms']} for r in last]), hide_index=True)
+
+        st.markdown("**This session**")
+        session_summary = summarize(profiler.records)
+        if session_summary:
+            st.dataframe(pd.DataFrame(session_summary), hide_index=True)
+
+        profilers = page_profilers(profiler.page)
+        st.markdown(f"**Page, {len(profilers)} sessions**")
+        page_summary = summarize([record for p in profilers for record in list(p.records)])
+        if page_summary:
+            st.dataframe(pd.DataFrame(page_summary), hide_index=True)
+
+        rates = cache_rates(profilers)
+        if rates:
+            st.markdown("**Cache hit rates (page)**")
+            st.dataframe(pd.DataFrame([
+                {'section': name, 'calls': calls, 'misses': misses, 'hit_rate': f"{rate:.0%}"}
+                for name, (calls, misses, rate) in rates.items()
+            ]), hide_index=True)
+
+        st.download_button(
+            "Download session spans (JSONL)",
+            data=export_jsonl(list(profiler.records)),
+            file_name=f"profile_{profiler.page}_{profiler.session_id}.jsonl",
+            mime="application/x-ndjson",
+            key=f"profiling_export_{profiler.page}"
+        )
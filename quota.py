@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# YouTube Data API quota accounting: every call made through QuotaTrackedClient is
+# recorded per day, API key hash and endpoint, and refused once the daily budget is near.
+USAGE_PATH = os.environ.get("QUOTA_USAGE_PATH", os.path.join("data", "quota_usage.sqlite3"))
+
+# Default daily quota of a Google Cloud project, and the share of it we allow ourselves to spend
+DAILY_BUDGET = int(os.environ.get("YOUTUBE_QUOTA_BUDGET", 10000))
+BUDGET_SAFETY = float(os.environ.get("YOUTUBE_QUOTA_SAFETY", 0.95))
+
+# Unit cost of each endpoint (https://developers.google.com/youtube/v3/determine_quota_cost)
+UNIT_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+}
+DEFAULT_UNIT_COST = 1
+
+_lock = threading.Lock()
+_connection = None
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of making a call that would go over the daily budget"""
+
+
+def _connect():
+    """Open (once per process) the usage database and create the table if needed"""
+    global _connection
+    if _connection is None:
+        folder = os.path.dirname(USAGE_PATH)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        _connection = sqlite3.connect(USAGE_PATH, check_same_thread=False)
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                day TEXT NOT NULL,
+                key_hash TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                units INTEGER NOT NULL,
+                errors INTEGER NOT NULL,
+                total_latency REAL NOT NULL,
+                PRIMARY KEY (day, key_hash, endpoint)
+            )
+        """)
+        _connection.commit()
+    return _connection
+
+
+def quota_day():
+    """The quota day; YouTube resets quotas at midnight Pacific time"""
+    try:
+        from zoneinfo import ZoneInfo
+        now = datetime.now(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        now = datetime.now(timezone(timedelta(hours=-8)))
+    return now.strftime("%Y-%m-%d")
+
+
+def units_used(key_hash, day=None):
+    """Units spent today (or on day) with one API key"""
+    with _lock:
+        row = _connect().execute(
+            "SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE day = ? AND key_hash = ?",
+            (day or quota_day(), key_hash)
+        ).fetchone()
+    return row[0]
+
+
+def record_call(key_hash, endpoint, units, latency, error=False):
+    with _lock:
+        connection = _connect()
+        connection.execute("""
+            INSERT INTO quota_usage (day, key_hash, endpoint, calls, units, errors, total_latency)
+            VALUES (?, ?, ?, 1, ?, ?, ?)
+            ON CONFLICT (day, key_hash, endpoint) DO UPDATE SET
+                calls = calls + 1,
+                units = units + excluded.units,
+                errors = errors + excluded.errors,
+                total_latency = total_latency + excluded.total_latency
+        """, (quota_day(), key_hash, endpoint, units, int(error), latency))
+        connection.commit()
+
+
+def usage_report(key_hash=None, day=None):
+    """Usage rows (one per day, key and endpoint), newest day first, optionally filtered"""
+    query = "SELECT day, key_hash, endpoint, calls, units, errors, total_latency FROM quota_usage WHERE 1 = 1"
+    params = []
+    if key_hash:
+        query += " AND key_hash = ?"
+        params.append(key_hash)
+    if day:
+        query += " AND day = ?"
+        params.append(day)
+    query += " ORDER BY day DESC, units DESC"
+
+    with _lock:
+        rows = _connect().execute(query, params).fetchall()
+    return [
+        {
+            'day': day,
+            'key_hash': key_hash[:12],
+            'endpoint': endpoint,
+            'calls': calls,
+            'units': units,
+            'errors': errors,
+            'avg_latency_ms': round(1000 * total_latency / calls, 1) if calls else 0.0
+        }
+        for day, key_hash, endpoint, calls, units, errors, total_latency in rows
+    ]
+
+
+class _TrackedRequest:
+    def __init__(self, request, endpoint, key_hash):
+        self._request = request
+        self._endpoint = endpoint
+        self._key_hash = key_hash
+
+    def execute(self, *args, **kwargs):
+        units = UNIT_COSTS.get(self._endpoint, DEFAULT_UNIT_COST)
+        used = units_used(self._key_hash)
+        if used + units > DAILY_BUDGET * BUDGET_SAFETY:
+            raise QuotaExceeded(
+                f"{self._endpoint} needs {units} units but {used} of the {DAILY_BUDGET} daily budget are used"
+            )
+
+        started = time.monotonic()
+        try:
+            response = self._request.execute(*args, **kwargs)
+        except Exception:
+            # Failed calls still cost quota
+            record_call(self._key_hash, self._endpoint, units, time.monotonic() - started, error=True)
+            raise
+        record_call(self._key_hash, self._endpoint, units, time.monotonic() - started)
+        return response
+
+
+class _TrackedResource:
+    def __init__(self, resource, name, key_hash):
+        self._resource = resource
+        self._name = name
+        self._key_hash = key_hash
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            request = getattr(self._resource, method)(*args, **kwargs)
+            return _TrackedRequest(request, f"{self._name}.{method}", self._key_hash)
+        return call
+
+
+class QuotaTrackedClient:
+    """Wraps a googleapiclient YouTube client so every request is budgeted and recorded"""
+
+    def __init__(self, client, key_hash):
+        self._client = client
+        self.key_hash = key_hash
+
+    def __getattr__(self, name):
+        def resource(*args, **kwargs):
+            return _TrackedResource(getattr(self._client, name)(*args, **kwargs), name, self.key_hash)
+        return resource
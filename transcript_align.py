@@ -0,0 +1,53 @@
+import numpy as np
+
+# Time-aligned join of two caption tracks of the same video (e.g. Korean and English).
+# Each segment of the primary track gets the text of every secondary segment whose time
+# interval overlaps it. The secondary track is sorted by start once; for each primary
+# segment the candidates are found with two binary searches instead of a nested loop:
+#   - everything starting before the primary segment ends: searchsorted on the starts
+#   - everything that could still be running when it starts: searchsorted on the running
+#     maximum of the ends (non-decreasing, so it can be binary searched even though the
+#     ends themselves are not sorted when segments overlap)
+
+
+def interval_arrays(transcript):
+    """(starts, ends) of a transcript as float arrays"""
+    starts = np.fromiter((entry['start'] for entry in transcript), dtype=np.float64, count=len(transcript))
+    durations = np.fromiter((entry.get('duration', 0) for entry in transcript), dtype=np.float64, count=len(transcript))
+    return starts, starts + durations
+
+
+def overlap_ranges(starts, ends, other_starts, other_ends):
+    """
+    For intervals [starts[i], ends[i]) return (order, lo, hi): the other intervals that can
+    overlap interval i are order[lo[i]:hi[i]] (sorted by start). Candidates still need the
+    exact check other_ends > starts[i], which only matters when the other track overlaps itself.
+    """
+    order = np.argsort(other_starts, kind='stable')
+    sorted_starts = other_starts[order]
+    running_end = np.maximum.accumulate(other_ends[order]) if len(order) else other_ends
+    hi = np.searchsorted(sorted_starts, ends, side='left')
+    lo = np.searchsorted(running_end, starts, side='right')
+    return order, lo, np.maximum(lo, hi)
+
+
+def align_transcripts(primary, secondary, separator=" "):
+    """
+    One aligned text per primary segment: the overlapping secondary segments joined in time
+    order, or '' where nothing overlaps. Both tracks are lists of {'text', 'start', 'duration'}.
+    """
+    starts, ends = interval_arrays(primary)
+    other_starts, other_ends = interval_arrays(secondary)
+    # Zero-length segments would never overlap anything; treat them as instants
+    ends = np.maximum(ends, starts + 1e-3)
+    other_ends = np.maximum(other_ends, other_starts + 1e-3)
+
+    order, lo, hi = overlap_ranges(starts, ends, other_starts, other_ends)
+    sorted_ends = other_ends[order]
+    texts = [secondary[j]['text'].strip() for j in order]
+
+    aligned = []
+    for i in range(len(primary)):
+        candidates = range(lo[i], hi[i])
+        aligned.append(separator.join(texts[j] for j in candidates if sorted_ends[j] > starts[i]))
+    return aligned
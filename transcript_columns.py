@@ -0,0 +1,194 @@
+import hashlib
+from array import array
+import numpy as np
+import pandas as pd
+from transcript_align import align_transcripts
+
+# Compact struct-of-arrays container for extracted transcripts.
+# Times live in float arrays, the per-track metadata (language, name, caption type) is
+# stored once per track and referenced by a small index, and the text is one list.
+# Fields that can be derived (timestamps, links, rounded times) are computed on demand.
+
+# Columns of each download format: (output column, field)
+EXPORT_COLUMNS = {
+    'full': [
+        ('video_id', 'video_id'),
+        ('timestamp', 'timestamp'),
+        ('end_timestamp', 'end_timestamp'),
+        ('start_time', 'start_time'),
+        ('end_time', 'end_time'),
+        ('duration', 'duration'),
+        ('text', 'text'),
+        ('youtube_link', 'youtube_link'),
+        ('language', 'language'),
+        ('language_name', 'language_name'),
+        ('caption_type', 'caption_type'),
+        ('segment_number', 'segment_number'),
+    ],
+    'simple': [
+        ('timestamp', 'timestamp'),
+        ('language', 'language_name'),
+        ('text', 'text'),
+        ('youtube_link', 'youtube_link'),
+        ('video_id', 'video_id'),
+    ],
+    'timeline': [
+        ('time', 'timestamp'),
+        ('language', 'language_name'),
+        ('text', 'text'),
+    ],
+}
+
+
+def format_time(seconds):
+    """Format time from seconds to HH:MM:SS"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def round_values(values, digits=1):
+    """Python's round() per value; np.round rounds some ties differently (e.g. 0.15)"""
+    return [round(value, digits) for value in values.tolist()]
+
+
+class TranscriptColumns:
+    def __init__(self, video_id):
+        self.video_id = video_id
+        self.tracks = []                   # (language code, language name, caption type)
+        self.track = array('H')            # track index per segment
+        self.start = array('d')
+        self.duration = array('d')
+        self.segment_number = array('I')
+        self.text = []
+
+    def __len__(self):
+        return len(self.text)
+
+    def add_track(self, language, language_name, is_generated, transcript):
+        """Append one fetched track (list of {'text', 'start', 'duration'} entries)"""
+        track_index = len(self.tracks)
+        self.tracks.append((language, language_name, 'Auto-generated' if is_generated else 'Manual'))
+        for i, entry in enumerate(transcript):
+            self.track.append(track_index)
+            self.start.append(entry['start'])
+            self.duration.append(entry.get('duration', 0))
+            self.segment_number.append(i + 1)
+            self.text.append(entry['text'].strip())
+
+    def languages(self):
+        """Distinct language codes of the tracks that contributed segments, in track order"""
+        used = set(self.track)
+        return list(dict.fromkeys(self.tracks[i][0] for i in sorted(used)))
+
+    def language_names(self):
+        used = set(self.track)
+        return list(dict.fromkeys(self.tracks[i][1] for i in sorted(used)))
+
+    def total_duration(self):
+        if not self.text:
+            return 0.0
+        return float((np.frombuffer(self.start, dtype=np.float64) + np.frombuffer(self.duration, dtype=np.float64)).max())
+
+    def content_hash(self):
+        """Hash of the extracted content, used to memoize exports"""
+        digest = hashlib.sha256(self.video_id.encode('utf-8'))
+        digest.update(repr(self.tracks).encode('utf-8'))
+        digest.update(self.track.tobytes())
+        digest.update(self.start.tobytes())
+        digest.update(self.duration.tobytes())
+        digest.update("\x1e".join(self.text).encode('utf-8'))
+        return digest.hexdigest()
+
+    def can_align(self):
+        """Whether the tracks cover at least two distinct languages (needed for aligned_frame)"""
+        return len(self.languages()) >= 2
+
+    def track_transcript(self, language):
+        """Segments of the first track in this language, as {'text', 'start', 'duration'} entries"""
+        tracks = np.frombuffer(self.track, dtype=np.uint16)
+        for track_index, track in enumerate(self.tracks):
+            rows = np.flatnonzero(tracks == track_index)
+            if track[0] == language and len(rows):
+                return [
+                    {'text': self.text[row], 'start': self.start[row], 'duration': self.duration[row]}
+                    for row in rows
+                ]
+        return []
+
+    def aligned_frame(self, primary=None, secondary=None):
+        """
+        One row per segment of the primary track with the time-overlapping text of the
+        secondary track. Defaults to Korean (or the first extracted language) against the
+        next extracted language.
+        """
+        languages = self.languages()
+        primary = primary or ('ko' if 'ko' in languages else languages[0])
+        secondary = secondary or next((language for language in languages if language != primary), None)
+        if secondary is None or secondary == primary:
+            raise ValueError("A bilingual export needs tracks in two different languages")
+        primary_segments = self.track_transcript(primary)
+        translations = align_transcripts(primary_segments, self.track_transcript(secondary))
+        starts = np.array([entry['start'] for entry in primary_segments], dtype=np.float64)
+        ends = starts + np.array([entry['duration'] for entry in primary_segments], dtype=np.float64)
+        return pd.DataFrame({
+            'timestamp': [format_time(value) for value in starts],
+            'start_time': round_values(starts),
+            'end_time': round_values(ends),
+            f'text_{primary}': [entry['text'] for entry in primary_segments],
+            f'text_{secondary}': translations,
+            'youtube_link': [f"https://www.youtube.com/watch?v={self.video_id}&t={int(value)}" for value in starts],
+        })
+
+    def column(self, field, start=0, stop=None):
+        """One column (stored or derived) for rows start:stop"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        starts = np.frombuffer(self.start, dtype=np.float64)[start:stop]
+        durations = np.frombuffer(self.duration, dtype=np.float64)[start:stop]
+        tracks = np.frombuffer(self.track, dtype=np.uint16)[start:stop]
+        count = stop - start
+
+        if field == 'video_id':
+            return [self.video_id] * count
+        if field == 'text':
+            return self.text[start:stop]
+        if field == 'segment_number':
+            return np.frombuffer(self.segment_number, dtype=np.uint32)[start:stop].astype(np.int64)
+        if field == 'start_time_seconds':
+            return starts.copy()
+        if field == 'end_time_seconds':
+            return starts + durations
+        if field == 'start_time':
+            return round_values(starts)
+        if field == 'end_time':
+            return round_values(starts + durations)
+        if field == 'duration':
+            return round_values(durations)
+        if field == 'timestamp':
+            return [format_time(value) for value in starts]
+        if field == 'end_timestamp':
+            return [format_time(value) for value in starts + durations]
+        if field == 'youtube_link':
+            return [f"https://www.youtube.com/watch?v={self.video_id}&t={int(value)}" for value in starts]
+        if field in ('language', 'language_name', 'caption_type'):
+            position = ('language', 'language_name', 'caption_type').index(field)
+            values = [track[position] for track in self.tracks]
+            return [values[i] for i in tracks]
+        raise KeyError(field)
+
+    def to_frame(self, fields, start=0, stop=None):
+        """DataFrame of the given fields; fields is a list of names or (output column, field) pairs"""
+        columns = {}
+        for field in fields:
+            name, source = field if isinstance(field, tuple) else (field, field)
+            columns[name] = self.column(source, start, stop)
+        return pd.DataFrame(columns)
+
+    def to_csv(self, export_format):
+        """One download format as CSV bytes (UTF-8 with BOM, so Excel shows Hangul correctly)"""
+        if export_format == 'bilingual':
+            df = self.aligned_frame()
+        else:
+            df = self.to_frame(EXPORT_COLUMNS[export_format])
+        csv_data = df.to_csv(index=False, encoding='utf-8-sig')
+        return csv_data.encode('utf-8-sig')
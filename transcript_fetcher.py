@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from youtube_endpoints import TranscriptApi
+import transcript_store
+from fetch_scheduler import scheduler, TranscriptFetchError, DISABLED, NOT_FOUND, UNAVAILABLE
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Concurrency limit and per-request timeout (seconds) for fetching many transcripts at once
+FETCH_WORKERS = int(os.environ.get("TRANSCRIPT_FETCH_WORKERS", 8))
+FETCH_TIMEOUT = float(os.environ.get("TRANSCRIPT_FETCH_TIMEOUT", 20))
+
+
+def get_transcript(video_id, language='ko'):
+    """
+    Read-through fetch of one transcript: persistent store first, then YouTube.
+    Returns None when the video has no captions in that language (or is removed or
+    private, which is remembered like missing captions); other failures raise
+    TranscriptFetchError carrying the scheduler's failure reason.
+    """
+    found, transcript = transcript_store.load_transcript(video_id, language)
+    if found:
+        return transcript
+
+    result = scheduler.call(video_id, TranscriptApi.get_transcript, video_id, languages=[language])
+    if result.ok:
+        transcript_store.save_transcript(video_id, language, result.value)
+        return result.value
+    if result.reason in (DISABLED, NOT_FOUND, UNAVAILABLE):
+        transcript_store.save_transcript(video_id, language, None)
+        return None
+    raise TranscriptFetchError(result)
+
+
+def get_transcript_track(video_id, language='ko'):
+    """
+    Like get_transcript, but also reports which kind of track was used and its name.
+    Returns (transcript, 'Manual' or 'Auto-generated', language name), or
+    (None, None, None) without captions. The name is stored with the track, so it
+    costs no extra request; tracks stored before names were kept fall back to the code.
+    """
+    for is_generated in (False, True):
+        found, transcript, language_name = transcript_store.load_track(video_id, transcript_store.track_key(language, is_generated))
+        if found and transcript:
+            return transcript, 'Auto-generated' if is_generated else 'Manual', language_name or language
+    found, transcript = transcript_store.load_transcript(video_id, language)
+    if found and transcript is None:
+        return None, None, None
+
+    # find_transcript prefers manual tracks over auto-generated ones, like get_transcript
+    result = scheduler.call(video_id, lambda: TranscriptApi.list_transcripts(video_id).find_transcript([language]))
+    if result.ok:
+        track = result.value
+        result = scheduler.call(video_id, track.fetch)
+    if result.ok:
+        transcript_store.save_transcript(video_id, transcript_store.track_key(language, track.is_generated), result.value, track.language)
+        transcript_store.save_transcript(video_id, language, result.value)
+        return result.value, 'Auto-generated' if track.is_generated else 'Manual', track.language
+    if result.reason in (DISABLED, NOT_FOUND, UNAVAILABLE):
+        transcript_store.save_transcript(video_id, language, None)
+        return None, None, None
+    raise TranscriptFetchError(result)
+
+
+def iter_transcripts(video_ids, language='ko', max_workers=None, timeout=None, fetch_one=get_transcript):
+    """
+    Fetch transcripts in a bounded thread pool and yield (video_id, transcript, error)
+    as each one finishes. error is None on success; a request that runs longer than
+    timeout seconds is given up on and reported as a timeout. fetch_one(video_id, language)
+    does the actual fetch (get_transcript by default).
+    """
+    max_workers = max_workers or FETCH_WORKERS
+    timeout = timeout or FETCH_TIMEOUT
+    started = {}
+    started_lock = threading.Lock()
+
+    def fetch(video_id):
+        with started_lock:
+            started[video_id] = time.monotonic()
+        return fetch_one(video_id, language)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(fetch, video_id): video_id for video_id in dict.fromkeys(video_ids)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                video_id = futures[future]
+                try:
+                    yield video_id, future.result(), None
+                except Exception as e:
+                    logger.error(f"Error fetching transcript for {video_id}: {e}")
+                    yield video_id, None, str(e)
+
+            # Give up on requests that have been running longer than the timeout
+            now = time.monotonic()
+            with started_lock:
+                timed_out = [f for f in pending if now - started.get(futures[f], now) > timeout]
+            for future in timed_out:
+                pending.discard(future)
+                logger.warning(f"Transcript fetch for {futures[future]} timed out after {timeout}s")
+                yield futures[future], None, f"Timed out after {timeout:g}s"
+    finally:
+        # Cancel anything still queued (e.g. when the caller stops early)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_transcripts(video_ids, language='ko', max_workers=None, timeout=None):
+    """Fetch many transcripts concurrently; returns ({video_id: transcript}, {video_id: error})"""
+    transcripts = {}
+    errors = {}
+    for video_id, transcript, error in iter_transcripts(video_ids, language, max_workers, timeout):
+        if error:
+            errors[video_id] = error
+        else:
+            transcripts[video_id] = transcript
+    return transcripts, errors
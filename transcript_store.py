@@ -0,0 +1,124 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Persistent transcript store shared by the caption search page and the extractor.
+# Transcripts are kept in a SQLite file (zlib-compressed JSON) keyed by
+# (video_id, language), so a restart or redeploy does not send us back to YouTube.
+STORE_PATH = os.environ.get("TRANSCRIPT_STORE_PATH", os.path.join("data", "transcripts.sqlite3"))
+
+# How long a stored transcript is served before it is fetched again (default 30 days)
+TRANSCRIPT_TTL = int(os.environ.get("TRANSCRIPT_STORE_TTL", 30 * 86400))
+
+# How long a "no transcript" answer (TranscriptsDisabled/NoTranscriptFound/VideoUnavailable) is remembered (default 1 day)
+MISSING_TTL = int(os.environ.get("TRANSCRIPT_STORE_MISSING_TTL", 86400))
+
+_lock = threading.Lock()
+_connection = None
+
+
+def _connect():
+    """Open (once per process) the SQLite store and create the table if needed"""
+    global _connection
+    if _connection is None:
+        folder = os.path.dirname(STORE_PATH)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        _connection = sqlite3.connect(STORE_PATH, check_same_thread=False)
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                available INTEGER NOT NULL,
+                payload BLOB,
+                language_name TEXT,
+                PRIMARY KEY (video_id, language)
+            )
+        """)
+        # Stores created before track language names were kept
+        columns = [row[1] for row in _connection.execute("PRAGMA table_info(transcripts)")]
+        if 'language_name' not in columns:
+            _connection.execute("ALTER TABLE transcripts ADD COLUMN language_name TEXT")
+        _connection.commit()
+    return _connection
+
+
+def track_key(language_code, is_generated=False):
+    """
+    Store key for one specific caption track. Manual and auto-generated tracks are kept
+    apart from each other and from the plain language key, which holds whichever track
+    YouTube picked.
+    """
+    return f"{language_code}@auto" if is_generated else f"{language_code}@manual"
+
+
+def load_transcript(video_id, language):
+    """
+    Look up a transcript in the store.
+
+    Returns (found, transcript). found is False when nothing fresh is stored;
+    transcript is None when the video is known to have no such captions.
+    """
+    found, transcript, _ = load_track(video_id, language)
+    return found, transcript
+
+
+def load_track(video_id, language):
+    """Like load_transcript, but returns (found, transcript, language name or None)"""
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT fetched_at, available, payload, language_name FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error reading transcript store: {e}")
+        return False, None, None
+
+    if row is None:
+        return False, None, None
+
+    fetched_at, available, payload, language_name = row
+    ttl = TRANSCRIPT_TTL if available else MISSING_TTL
+    if time.time() - fetched_at > ttl:
+        return False, None, None
+
+    if not available:
+        return True, None, language_name
+    return True, json.loads(zlib.decompress(payload).decode('utf-8')), language_name
+
+
+def save_transcript(video_id, language, transcript, language_name=None):
+    """
+    Store a transcript; pass None to remember that the video has no such captions.
+    language_name is the track's display name (e.g. 'Korean (auto-generated)') if known.
+    """
+    if transcript is None:
+        available, payload = 0, None
+    else:
+        entries = [
+            {'text': entry['text'], 'start': entry['start'], 'duration': entry.get('duration', 0)}
+            for entry in transcript
+        ]
+        available = 1
+        payload = zlib.compress(json.dumps(entries, ensure_ascii=False).encode('utf-8'))
+
+    try:
+        with _lock:
+            connection = _connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, language, fetched_at, available, payload, language_name) VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, language, time.time(), available, payload, language_name)
+            )
+            connection.commit()
+    except sqlite3.Error as e:
+        logger.error(f"Error writing transcript store: {e}")
+
@@ -0,0 +1,292 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Persistent translation cache keyed by (src, dest, normalized text), shared by all users.
+# Least recently used entries are evicted once the cache grows past CACHE_SIZE.
+CACHE_PATH = os.environ.get("TRANSLATION_CACHE_PATH", os.path.join("data", "translations.sqlite3"))
+CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", 50000))
+
+# Worker pool size and per-sentence timeout (seconds) of the non-blocking pipeline
+WORKERS = int(os.environ.get("TRANSLATION_WORKERS", 4))
+TIMEOUT = float(os.environ.get("TRANSLATION_TIMEOUT", 10))
+
+_lock = threading.Lock()
+_connection = None
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _connect():
+    """Open (once per process) the translation cache and create the table if needed"""
+    global _connection
+    if _connection is None:
+        folder = os.path.dirname(CACHE_PATH)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        _connection = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _connection.executescript("""
+            CREATE TABLE IF NOT EXISTS translations (
+                src TEXT NOT NULL,
+                dest TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (src, dest, text)
+            );
+            CREATE INDEX IF NOT EXISTS translations_by_use ON translations (last_used);
+        """)
+        _connection.commit()
+    return _connection
+
+
+def normalize_text(text):
+    """Cache key form of a sentence: NFC-normalized with collapsed whitespace"""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+def get_cache_stats():
+    """Hit/miss counters of the translation cache since the process started"""
+    with _lock:
+        stats = dict(_stats)
+        try:
+            stats['entries'] = _connect().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        except sqlite3.Error:
+            stats['entries'] = None
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def lookup_cached(texts, src='ko', dest='en', count=True):
+    """Cached translations for already-normalized texts: {text: translation}; counts hits and misses if count"""
+    found = {}
+    with _lock:
+        connection = _connect()
+        for text in texts:
+            row = connection.execute(
+                "SELECT translation FROM translations WHERE src = ? AND dest = ? AND text = ?",
+                (src, dest, text)
+            ).fetchone()
+            if row:
+                found[text] = row[0]
+        if found:
+            now = time.time()
+            connection.executemany(
+                "UPDATE translations SET last_used = ? WHERE src = ? AND dest = ? AND text = ?",
+                [(now, src, dest, text) for text in found]
+            )
+            connection.commit()
+        if count:
+            _stats['hits'] += len(found)
+            _stats['misses'] += len(texts) - len(found)
+    return found
+
+
+def store_translations(translations, src='ko', dest='en'):
+    """Save {normalized text: translation} and evict the least recently used overflow"""
+    if not translations:
+        return
+    now = time.time()
+    with _lock:
+        connection = _connect()
+        connection.executemany(
+            "INSERT OR REPLACE INTO translations (src, dest, text, translation, last_used) VALUES (?, ?, ?, ?, ?)",
+            [(src, dest, text, translation, now) for text, translation in translations.items()]
+        )
+        overflow = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - CACHE_SIZE
+        if overflow > 0:
+            connection.execute(
+                "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+        connection.commit()
+
+
+def translate_batch(texts, translate_many, src='ko', dest='en', count=True):
+    """
+    Translate a list of sentences through the persistent cache.
+
+    Sentences are deduplicated and normalized; only cache misses are sent, in one
+    batch, to translate_many(list_of_texts, src, dest) -> list_of_translations.
+    Returns {original text: translation}; sentences that failed are left out.
+    count=False leaves the hit/miss counters alone (for lookups already counted).
+    """
+    normalized = {text: normalize_text(text) for text in texts}
+    unique = list(dict.fromkeys(value for value in normalized.values() if value))
+
+    translations = lookup_cached(unique, src, dest, count)
+    missing = [text for text in unique if text not in translations]
+    if missing:
+        try:
+            results = translate_many(missing, src, dest)
+            fetched = {text: result for text, result in zip(missing, results) if result}
+            store_translations(fetched, src, dest)
+            translations.update(fetched)
+        except Exception as e:
+            logger.error(f"Batch translation of {len(missing)} sentences failed: {e}")
+
+    return {text: translations[key] for text, key in normalized.items() if key in translations}
+
+
+# Translation backends: anything with translate_many(texts, src, dest) -> list of translations
+class TranslationBackend:
+    name = "base"
+
+    def translate_many(self, texts, src, dest):
+        raise NotImplementedError
+
+
+class GoogletransBackend(TranslationBackend):
+    """googletrans, with one Translator per worker thread"""
+    name = "googletrans"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate_many(self, texts, src, dest):
+        if not hasattr(self._local, 'translator'):
+            from googletrans import Translator
+            self._local.translator = Translator()
+        return [result.text for result in self._local.translator.translate(list(texts), src=src, dest=dest)]
+
+
+class DictionaryBackend(TranslationBackend):
+    """Offline backend that looks sentences up in a dict (for testing and offline use)"""
+    name = "dictionary"
+
+    def __init__(self, dictionary=None, default=None):
+        self.dictionary = dictionary or {}
+        self.default = default
+
+    def translate_many(self, texts, src, dest):
+        return [self.dictionary.get(text, self.default if self.default is not None else f"[{dest}] {text}") for text in texts]
+
+
+BACKENDS = {
+    GoogletransBackend.name: GoogletransBackend,
+    DictionaryBackend.name: DictionaryBackend,
+}
+
+
+def get_backend(name=None):
+    """Backend by name; defaults to the TRANSLATION_BACKEND environment variable, then googletrans"""
+    name = name or os.environ.get("TRANSLATION_BACKEND", GoogletransBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend: {name}")
+    return BACKENDS[name]()
+
+
+class TranslationPipeline:
+    """
+    Non-blocking translation through the persistent cache.
+
+    submit() returns a future per sentence right away: cache hits are already
+    resolved, misses are split into one batch per worker and translated through
+    translate_batch in a worker pool. Sentences that
+    are already being translated (e.g. by another session) share one future.
+    """
+
+    def __init__(self, backend, max_workers=None, timeout=None, src='ko', dest='en'):
+        self.backend = backend
+        self.timeout = timeout or TIMEOUT
+        self.src = src
+        self.dest = dest
+        self.workers = max_workers or WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translate")
+        self._inflight = {}
+        self._started = {}  # normalized text -> time its translation started running
+        self._inflight_lock = threading.Lock()
+
+    def _translate_chunk(self, chunk):
+        """Translate one chunk of cache misses with a single batch call and resolve their futures"""
+        now = time.monotonic()
+        with self._inflight_lock:
+            for text in chunk:
+                self._started[text] = now
+        try:
+            # The misses were already counted by submit()
+            translations = translate_batch(list(chunk), self.backend.translate_many, self.src, self.dest, count=False)
+        except Exception as e:
+            logger.error(f"Translation of {len(chunk)} sentences failed: {e}")
+            translations = {}
+        finally:
+            with self._inflight_lock:
+                for text in chunk:
+                    self._inflight.pop(text, None)
+                    self._started.pop(text, None)
+        for text, future in chunk.items():
+            future.set_result(translations.get(text))
+
+    def submit(self, texts, count=True):
+        """
+        {original text: Future resolving to its translation}. Pass count=False when the
+        same sentences were already counted (e.g. a rerun of the same page), so the
+        cache hit rate is not inflated.
+        """
+        normalized = {text: normalize_text(text) for text in texts}
+        unique = list(dict.fromkeys(value for value in normalized.values() if value))
+        cached = lookup_cached(unique, self.src, self.dest, count)
+
+        futures = {}
+        missing = {}
+        for key in unique:
+            if key in cached:
+                future = Future()
+                future.set_result(cached[key])
+            else:
+                with self._inflight_lock:
+                    future = self._inflight.get(key)
+                    if future is None:
+                        future = Future()
+                        self._inflight[key] = future
+                        missing[key] = future
+            futures[key] = future
+
+        # Misses go out in batches, one chunk per worker, so the page is spread over the pool
+        if missing:
+            keys = list(missing)
+            size = -(-len(keys) // self.workers)
+            for i in range(0, len(keys), size):
+                self._executor.submit(self._translate_chunk, {key: missing[key] for key in keys[i:i + size]})
+        return {text: futures[key] for text, key in normalized.items() if key in futures}
+
+    def iter_completed(self, futures):
+        """
+        Yield (text, translation or None) as translations finish. Each translation gets
+        its own timeout, counted from when a worker starts it, and yields None past it.
+        """
+        by_future = {}
+        for text, future in futures.items():
+            by_future.setdefault(future, []).append(text)
+
+        pending = set(by_future)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Translation failed: {e}")
+                    result = None
+                for text in by_future[future]:
+                    yield text, result
+
+            # Give up on translations that have been running longer than the timeout
+            now = time.monotonic()
+            with self._inflight_lock:
+                timed_out = [
+                    future for future in pending
+                    if now - self._started.get(normalize_text(by_future[future][0]), now) > self.timeout
+                ]
+            for future in timed_out:
+                pending.discard(future)
+                logger.warning(f"Translation timed out after {self.timeout}s")
+                for text in by_future[future]:
+                    yield text, None
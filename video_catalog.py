@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Persistent catalog of every video in a channel, crawled through the uploads playlist.
+# playlistItems.list costs 1 quota unit per page of 50 (search.list costs 100), and
+# later syncs only page until they reach videos already seen.
+CATALOG_PATH = os.environ.get("VIDEO_CATALOG_PATH", os.path.join("data", "video_catalog.sqlite3"))
+
+# Curated channels for "Search by Channel" and the offline corpus builder
+CURATED_CHANNELS = {
+    "SBS Running Man": "UCaKod3X1Tn4c7Ci0iUKcvzQ",
+    "DdeunDdeun": "UCDNvRZRgvkBTUkQzFoT_8rA", 
+    "channel fullmoon" : "UCQ2O-iftmnlfrBuNsUUTofQ",
+}
+
+_lock = threading.Lock()
+_connection = None
+
+
+def _connect():
+    """Open (once per process) the catalog database and create the tables if needed"""
+    global _connection
+    if _connection is None:
+        folder = os.path.dirname(CATALOG_PATH)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        _connection = sqlite3.connect(CATALOG_PATH, check_same_thread=False)
+        _connection.executescript("""
+            CREATE TABLE IF NOT EXISTS channels (
+                channel_id TEXT PRIMARY KEY,
+                uploads_playlist_id TEXT NOT NULL,
+                newest_published_at TEXT,
+                last_synced_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL,
+                title TEXT,
+                channel_title TEXT,
+                published_at TEXT,
+                view_count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS videos_by_channel ON videos (channel_id, published_at);
+        """)
+        # Catalogs created before view counts were stored
+        columns = [row[1] for row in _connection.execute("PRAGMA table_info(videos)")]
+        if 'view_count' not in columns:
+            _connection.execute("ALTER TABLE videos ADD COLUMN view_count INTEGER")
+        _connection.commit()
+    return _connection
+
+
+def get_uploads_playlist_id(youtube, channel_id):
+    """Uploads playlist of a channel (looked up once, then remembered in the catalog)"""
+    with _lock:
+        row = _connect().execute(
+            "SELECT uploads_playlist_id FROM channels WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+    if row:
+        return row[0]
+
+    response = youtube.channels().list(part="contentDetails", id=channel_id).execute()
+    if not response.get('items'):
+        raise ValueError(f"Channel {channel_id} not found")
+    uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+
+    with _lock:
+        connection = _connect()
+        connection.execute(
+            "INSERT OR IGNORE INTO channels (channel_id, uploads_playlist_id) VALUES (?, ?)",
+            (channel_id, uploads_playlist_id)
+        )
+        connection.commit()
+    return uploads_playlist_id
+
+
+def iter_playlist_items(youtube, playlist_id, max_pages=None):
+    """Yield every item of a playlist, following nextPageToken"""
+    page_token = None
+    pages = 0
+    while True:
+        response = youtube.playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=page_token
+        ).execute()
+        yield from response.get('items', [])
+
+        pages += 1
+        page_token = response.get('nextPageToken')
+        if not page_token or (max_pages and pages >= max_pages):
+            break
+
+
+def sync_channel(youtube, channel_id):
+    """
+    Crawl a channel's uploads into the catalog.
+
+    The first sync walks the whole uploads playlist; later syncs stop at the first
+    video published at or before the newest one already stored. Returns the number
+    of videos added or updated.
+    """
+    playlist_id = get_uploads_playlist_id(youtube, channel_id)
+
+    with _lock:
+        newest_known = _connect().execute(
+            "SELECT newest_published_at FROM channels WHERE channel_id = ?", (channel_id,)
+        ).fetchone()[0]
+
+    rows = []
+    for item in iter_playlist_items(youtube, playlist_id):
+        snippet = item['snippet']
+        published_at = item.get('contentDetails', {}).get('videoPublishedAt') or snippet.get('publishedAt', '')
+        # Uploads are listed newest first, so everything after this point is already stored
+        if newest_known and published_at and published_at <= newest_known:
+            break
+        rows.append((
+            snippet['resourceId']['videoId'],
+            channel_id,
+            snippet.get('title', ''),
+            snippet.get('channelTitle', ''),
+            published_at
+        ))
+
+    with _lock:
+        connection = _connect()
+        connection.executemany(
+            "INSERT OR REPLACE INTO videos (video_id, channel_id, title, channel_title, published_at, view_count) VALUES (?, ?, ?, ?, ?, NULL)",
+            rows
+        )
+        # The sync marker only moves after a complete crawl, so an interrupted first crawl is retried in full
+        connection.execute(
+            "UPDATE channels SET newest_published_at = (SELECT MAX(published_at) FROM videos WHERE channel_id = ?), last_synced_at = ? WHERE channel_id = ?",
+            (channel_id, time.time(), channel_id)
+        )
+        connection.commit()
+
+    logger.info(f"Synced channel {channel_id}: {len(rows)} new videos")
+    sync_view_counts(youtube, channel_id)
+    return len(rows)
+
+
+def sync_view_counts(youtube, channel_id):
+    """
+    Store view counts for the channel's videos that have none yet, 50 per videos.list
+    call (1 quota unit each), so ranking by views needs no API calls. A failure leaves
+    the remaining counts empty until the next sync.
+    """
+    with _lock:
+        missing = [row[0] for row in _connect().execute(
+            "SELECT video_id FROM videos WHERE channel_id = ? AND view_count IS NULL", (channel_id,)
+        )]
+
+    for i in range(0, len(missing), 50):
+        batch = missing[i:i + 50]
+        try:
+            response = youtube.videos().list(part="statistics", id=",".join(batch), maxResults=50).execute()
+        except Exception as e:
+            logger.warning(f"Could not fetch view counts for channel {channel_id}: {e}")
+            break
+        counts = {item['id']: int(item['statistics'].get('viewCount', 0)) for item in response.get('items', [])}
+        with _lock:
+            connection = _connect()
+            # Videos the API no longer returns (removed or private) count as 0 views
+            connection.executemany(
+                "UPDATE videos SET view_count = ? WHERE video_id = ?",
+                [(counts.get(video_id, 0), video_id) for video_id in batch]
+            )
+            connection.commit()
+
+
+def load_channel_videos(channel_id):
+    """All catalogued videos of a channel, newest first, shaped like search.list items"""
+    with _lock:
+        rows = _connect().execute(
+            "SELECT video_id, title, channel_title, published_at FROM videos WHERE channel_id = ? ORDER BY published_at DESC",
+            (channel_id,)
+        ).fetchall()
+    return [
+        {
+            'id': {'kind': 'youtube#video', 'videoId': video_id},
+            'snippet': {'title': title, 'channelTitle': channel_title, 'publishedAt': published_at, 'channelId': channel_id}
+        }
+        for video_id, title, channel_title, published_at in rows
+    ]
+
+
+def load_most_viewed_videos(channel_id, limit):
+    """The channel's catalogued videos with the most stored views, shaped like load_channel_videos"""
+    with _lock:
+        rows = _connect().execute(
+            "SELECT video_id, title, channel_title, published_at FROM videos WHERE channel_id = ? ORDER BY COALESCE(view_count, 0) DESC, published_at DESC LIMIT ?",
+            (channel_id, limit)
+        ).fetchall()
+    return [
+        {
+            'id': {'kind': 'youtube#video', 'videoId': video_id},
+            'snippet': {'title': title, 'channelTitle': channel_title, 'publishedAt': published_at, 'channelId': channel_id}
+        }
+        for video_id, title, channel_title, published_at in rows
+    ]
@@ -0,0 +1,45 @@
+import os
+import requests
+from googleapiclient.discovery import build
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._transcripts import TranscriptListFetcher, _raise_http_errors
+from youtube_transcript_api._html_unescaping import unescape
+
+# Set up logging
+import logging
+logger = logging.getLogger(__name__)
+
+# Where the apps talk to YouTube. Setting YOUTUBE_FAKE_SERVER to the address of a running
+# fake_youtube_server.py (e.g. http://localhost:8765) sends both the Data API client and
+# the transcript fetches there instead, so the apps can be load-tested without spending
+# quota or getting throttled.
+FAKE_SERVER = os.environ.get("YOUTUBE_FAKE_SERVER", "").rstrip('/')
+
+
+def build_youtube(api_key):
+    """YouTube Data API v3 client for an API key"""
+    if FAKE_SERVER:
+        return build('youtube', 'v3', developerKey=api_key, client_options={'api_endpoint': f"{FAKE_SERVER}/"})
+    return build('youtube', 'v3', developerKey=api_key)
+
+
+class LocalTranscriptListFetcher(TranscriptListFetcher):
+    """Reads the watch page from the fake server; caption parsing and errors stay the library's own"""
+
+    def _fetch_html(self, video_id):
+        response = self._http_client.get(f"{FAKE_SERVER}/watch", params={'v': video_id}, headers={'Accept-Language': 'en-US'})
+        return unescape(_raise_http_errors(response, video_id).text)
+
+
+class LocalTranscriptApi(YouTubeTranscriptApi):
+    @classmethod
+    def list_transcripts(cls, video_id, proxies=None, cookies=None):
+        with requests.Session() as http_client:
+            return LocalTranscriptListFetcher(http_client).fetch(video_id)
+
+
+# Use TranscriptApi wherever YouTubeTranscriptApi would be used
+TranscriptApi = LocalTranscriptApi if FAKE_SERVER else YouTubeTranscriptApi
+
+if FAKE_SERVER:
+    logger.warning(f"Using the fake YouTube server at {FAKE_SERVER}")
@@ -1,19 +1,33 @@
 import streamlit as st
 import pandas as pd
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptAvailable, NoTranscriptFound
+from youtube_endpoints import TranscriptApi, build_youtube
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import io
+import zipfile
+import transcript_store
+import profiling
+import transcript_fetcher
+import video_catalog
+from transcript_columns import TranscriptColumns, EXPORT_COLUMNS
+from fetch_scheduler import scheduler, DISABLED, NOT_FOUND, UNAVAILABLE
 
 # Set up logging
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of caption tracks fetched at the same time
+EXTRACT_WORKERS = 4
+
 # Initialize session state
 if 'available_transcripts' not in st.session_state:
     st.session_state.available_transcripts = []
 if 'extracted_data' not in st.session_state:
     st.session_state.extracted_data = []
+if 'extracted_hash' not in st.session_state:
+    st.session_state.extracted_hash = ""
 if 'current_video_id' not in st.session_state:
     st.session_state.current_video_id = ""
 
@@ -107,220 +121,401 @@ def format_time(seconds):
     hours, minutes = divmod(minutes, 60)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+# Caption track metadata (picklable, so it can be cached across sessions)
+@st.cache_data(ttl=3600, show_spinner=False)
+def list_caption_tracks(video_id):
+    """List a video's caption tracks with a single listing call"""
+    profiling.cache_miss("caption_tracks")
+    result = scheduler.call(video_id, TranscriptApi.list_transcripts, video_id)
+    if not result.ok:
+        if result.reason in (DISABLED, NOT_FOUND, UNAVAILABLE):
+            return []
+        # Transient failures raise, so they are not cached
+        raise RuntimeError(f"{result.reason}: {result.message}")
+    
+    return [
+        {
+            'lang': transcript.language_code,
+            'language_name': transcript.language,
+            'is_generated': transcript.is_generated,
+            'translation_languages': [language['language_code'] for language in transcript.translation_languages]
+        }
+        for transcript in result.value
+    ]
+
+# Transcript handles are only needed to fetch tracks that are not stored yet, so the
+# listing call is made lazily, at most once per extraction, and shared by the workers.
+def lazy_track_handles(video_id):
+    """Returns get_handle(selected) -> (transcript handle, None) or (None, failed FetchResult)"""
+    lock = threading.Lock()
+    listing = {}
+    
+    def get_handle(selected):
+        with lock:
+            if 'result' not in listing:
+                listing['result'] = scheduler.call(video_id, TranscriptApi.list_transcripts, video_id)
+        result = listing['result']
+        if not result.ok:
+            return None, result
+        
+        find = result.value.find_generated_transcript if selected['is_generated'] else result.value.find_manually_created_transcript
+        handle = scheduler.call(video_id, find, [selected['lang']])
+        if not handle.ok:
+            return None, handle
+        return handle.value, None
+    
+    return get_handle
+
+# Function to fetch one selected track: persistent store first, then the scheduler
+# (rate limit, backoff, retries). Runs in a worker thread, so it makes no Streamlit calls.
+def fetch_track(video_id, selected, get_handle):
+    """Fetch one caption track; returns (transcript, note, error)"""
+    store_key = transcript_store.track_key(selected['lang'], selected['is_generated'])
+    found, transcript = transcript_store.load_transcript(video_id, store_key)
+    if found:
+        return transcript, None, None if transcript else "not available for this video"
+    
+    handle, result = get_handle(selected)
+    if handle is not None:
+        result = scheduler.call(video_id, handle.fetch)
+    if result.ok:
+        transcript_store.save_transcript(video_id, store_key, result.value, selected['language_name'])
+        return result.value, None, None
+    if result.reason in (DISABLED, NOT_FOUND, UNAVAILABLE):
+        transcript_store.save_transcript(video_id, store_key, None)
+        return None, None, "not available for this video"
+    
+    if handle is not None and "no element found" in result.message.lower() and selected['lang'] != 'en':
+        # Method 2: Try translating to English first, then back (sometimes works)
+        fallback = scheduler.call(video_id, lambda: handle.translate('en').fetch())
+        if fallback.ok:
+            return fallback.value, f"extracted via English translation route after {result.attempts} failed attempts", None
+    
+    return None, None, f"({result.reason}) {result.message}"
+
 # Function to extract transcript (any language, no translation)
 def extract_transcript(video_id, selected_transcripts):
     """Extract transcript in original language - no translation"""
     
-    transcript_data = []
+    transcript_data = TranscriptColumns(video_id)
     
     try:
-        for selected_index in selected_transcripts:
-            selected = st.session_state.available_transcripts[selected_index]
-            
-            st.info(f"📥 Extracting {selected['language_name']} transcript...")
-            
-            # Extract the selected transcript with retry logic
-            transcript = None
-            
-            # Try multiple methods to fetch the transcript
-            try:
-                transcript = selected['transcript'].fetch()
-            except Exception as e:
-                if "no element found" in str(e).lower():
-                    st.warning(f"⚠️ First attempt failed for {selected['language_name']}, trying alternative method...")
-                    
-                    # Method 2: Try translating to English first, then back (sometimes works)
-                    try:
-                        if selected['lang'] != 'en':
-                            st.info("🔄 Trying to get transcript via English translation...")
-                            translated = selected['transcript'].translate('en')
-                            transcript = translated.fetch()
-                            st.success("✅ Successfully extracted via English translation route")
-                        else:
-                            raise e
-                    except Exception as e2:
-                        st.error(f"❌ Could not extract {selected['language_name']} transcript: {str(e)}")
-                        continue
-            
+        tracks = [st.session_state.available_transcripts[selected_index] for selected_index in selected_transcripts]
+        
+        # One status line per track, updated as each track finishes
+        status_lines = []
+        for selected in tracks:
+            status_line = st.empty()
+            status_line.info(f"📥 Extracting {selected['language_name']} transcript...")
+            status_lines.append(status_line)
+        progress_bar = st.progress(0.0, text=f"0/{len(tracks)} transcripts extracted")
+        
+        # Fetch the selected tracks concurrently
+        transcripts = {}
+        get_handle = lazy_track_handles(video_id)
+        with ThreadPoolExecutor(max_workers=min(len(tracks), EXTRACT_WORKERS) or 1) as executor:
+            futures = {executor.submit(fetch_track, video_id, selected, get_handle): n for n, selected in enumerate(tracks)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                n = futures[future]
+                name = tracks[n]['language_name']
+                try:
+                    transcript, note, error = future.result()
+                except Exception as e:
+                    transcript, note, error = None, None, str(e)
+                
+                if error:
+                    status_lines[n].error(f"❌ Could not extract {name} transcript: {error}")
+                elif note:
+                    status_lines[n].success(f"✅ {name}: {len(transcript)} segments ({note})")
+                else:
+                    status_lines[n].success(f"✅ {name}: {len(transcript)} segments")
+                transcripts[n] = transcript
+                progress_bar.progress(done / len(tracks), text=f"{done}/{len(tracks)} transcripts extracted")
+        
+        # Merge in selection order, then segment order, exactly like the serial version
+        for n, selected in enumerate(tracks):
+            transcript = transcripts.get(n)
             if not transcript:
                 continue
-            
-            # Process the transcript
-            for i, entry in enumerate(transcript):
-                start_time = entry['start']
-                duration = entry.get('duration', 0)
-                end_time = start_time + duration
-                text = entry['text'].strip()
-                
-                transcript_entry = {
-                    'video_id': video_id,
-                    'start_time_seconds': start_time,
-                    'end_time_seconds': end_time,
-                    'start_time': round(start_time, 1),
-                    'end_time': round(end_time, 1),
-                    'timestamp': format_time(start_time),
-                    'end_timestamp': format_time(end_time),
-                    'duration': round(duration, 1),
-                    'text': text,
-                    'youtube_link': f"https://www.youtube.com/watch?v={video_id}&t={int(start_time)}",
-                    'language': selected['lang'],
-                    'language_name': selected['language_name'],
-                    'caption_type': 'Auto-generated' if selected['is_generated'] else 'Manual',
-                    'segment_number': i + 1
-                }
-                transcript_data.append(transcript_entry)
+            transcript_data.add_track(selected['lang'], selected['language_name'], selected['is_generated'], transcript)
         
         return transcript_data
         
     except Exception as e:
         st.error(f"❌ Error extracting transcript: {str(e)}")
-        return []
+        return TranscriptColumns(video_id)
+
+# Download formats: label, help text and filename prefix (columns are in transcript_columns.EXPORT_COLUMNS)
+EXPORT_FORMATS = {
+    'full': {
+        'label': "📋 Download Full Details",
+        'help': "Complete transcript with all columns",
+        'prefix': "full_transcript",
+    },
+    'simple': {
+        'label': "🎯 Download Simple Format",
+        'help': "Basic format: timestamp, language, text, link",
+        'prefix': "simple_transcript",
+    },
+    'timeline': {
+        'label': "⏱️ Download Timeline Only",
+        'help': "Just timestamps, language, and text",
+        'prefix': "timeline",
+    },
+    'bilingual': {
+        'label': "🔗 Download Bilingual (Aligned)",
+        'help': "One row per Korean caption with the English (or other) caption shown at the same time",
+        'prefix': "bilingual_transcript",
+    },
+}
+
+# Build one export format as CSV bytes; memoized by the data's content hash
+@st.cache_data(max_entries=30, show_spinner=False)
+def build_export_csv(data_hash, export_format, _transcript_data):
+    profiling.cache_miss(f"export_{export_format}")
+    return _transcript_data.to_csv(export_format)
+
+# Language part of export filenames; a plain (uncached) function, it only joins the track codes
+def export_language_str(transcript_data):
+    # Include all languages in filename if multiple
+    languages = transcript_data.languages()
+    return "_".join(languages) if len(languages) <= 3 else f"{len(languages)}languages"
 
-# Function to save transcript to CSV with multiple format options
-def save_transcript_options(transcript_data, video_title="Unknown"):
+def request_export(export_format, data_hash):
+    st.session_state[f"export_ready_{export_format}"] = data_hash
+
+# Function to save transcript to CSV with multiple format options.
+# Nothing is serialized until the user asks for a format; each CSV is then built once per data hash.
+def save_transcript_options(transcript_data, video_title="Unknown", data_hash=None):
     """Provide multiple download options for transcript data"""
     if not transcript_data:
         st.warning("No transcript data to save.")
         return None
     
     st.markdown("### 📥 Download Options")
-
-    
-    # Create different format options
-    col1, col2, col3 = st.columns(3)
+    data_hash = data_hash or transcript_data.content_hash()
     
-    with col1:
-        # Full format with all columns
-        df = pd.DataFrame(transcript_data)
-        full_columns = [
-            'video_id',
-            'timestamp',
-            'end_timestamp', 
-            'start_time',
-            'end_time',
-            'duration',
-            'text',
-            'youtube_link',
-            'language',
-            'language_name',
-            'caption_type',
-            'segment_number'
-        ]
-        
-        df_ordered = df.reindex(columns=[col for col in full_columns if col in df.columns])
-        
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_title_clean = video_title.replace(' ', '_')[:50]
-        
-        # Include all languages in filename if multiple
-        languages = list(set([item['language'] for item in transcript_data]))
-        language_str = "_".join(languages) if len(languages) <= 3 else f"{len(languages)}languages"
-        
-        filename = f"full_transcript_{language_str}_{video_title_clean}_{timestamp}.csv"
-        
-        # Create download button for browser download
-        csv_data = df_ordered.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="📋 Download Full Details",
-            data=csv_data.encode('utf-8-sig'),
-            file_name=filename,
-            mime="text/csv",
-            key="download_full_csv",
-            help="Complete transcript with all columns"
-        )
-    
-    with col2:
-        # Simple format - perfect for analysis
-        simple_data = []
-        for item in transcript_data:
-            simple_data.append({
-                'timestamp': item['timestamp'],
-                'language': item['language_name'],
-                'text': item['text'],
-                'youtube_link': item['youtube_link'],
-                'video_id': item['video_id']
-            })
-        
-        df_simple = pd.DataFrame(simple_data)
-        
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_title_clean = video_title.replace(' ', '_')[:50]
-        
-        languages = list(set([item['language'] for item in transcript_data]))
-        language_str = "_".join(languages) if len(languages) <= 3 else f"{len(languages)}languages"
-        
-        filename = f"simple_transcript_{language_str}_{video_title_clean}_{timestamp}.csv"
-        
-        # Create download button for browser download
-        csv_data = df_simple.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="🎯 Download Simple Format",
-            data=csv_data.encode('utf-8-sig'),
-            file_name=filename,
-            mime="text/csv",
-            key="download_simple_csv",
-            help="Basic format: timestamp, language, text, link"
-        )
+    # Create different format options; the aligned export needs two distinct languages
+    formats = {
+        export_format: options for export_format, options in EXPORT_FORMATS.items()
+        if export_format != 'bilingual' or transcript_data.can_align()
+    }
+    columns = st.columns(len(formats))
     
-    with col3:
-        # Timeline format - minimal for analysis
-        timeline_data = []
-        for item in transcript_data:
-            timeline_data.append({
-                'time': item['timestamp'],
-                'language': item['language_name'],
-                'text': item['text']
-            })
-        
-        df_timeline = pd.DataFrame(timeline_data)
-        
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_title_clean = video_title.replace(' ', '_')[:50]
-        
-        languages = list(set([item['language'] for item in transcript_data]))
-        language_str = "_".join(languages) if len(languages) <= 3 else f"{len(languages)}languages"
-        
-        filename = f"timeline_{language_str}_{video_title_clean}_{timestamp}.csv"
-        
-        # Create download button for browser download
-        csv_data = df_timeline.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="⏱️ Download Timeline Only",
-            data=csv_data.encode('utf-8-sig'),
-            file_name=filename,
-            mime="text/csv",
-            key="download_timeline_csv",
-            help="Just timestamps, language, and text"
-        )
+    for column, (export_format, options) in zip(columns, formats.items()):
+        with column:
+            if st.session_state.get(f"export_ready_{export_format}") != data_hash:
+                st.button(
+                    options['label'],
+                    key=f"prepare_{export_format}_csv",
+                    help=options['help'],
+                    on_click=request_export,
+                    args=(export_format, data_hash)
+                )
+                continue
+            
+            # Generate filename
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            video_title_clean = video_title.replace(' ', '_')[:50]
+            language_str = export_language_str(transcript_data)
+            filename = f"{options['prefix']}_{language_str}_{video_title_clean}_{timestamp}.csv"
+            
+            # Create download button for browser download
+            with profiling.span(f"export_{export_format}", cached=True):
+                csv_data = build_export_csv(data_hash, export_format, transcript_data)
+            st.download_button(
+                label=options['label'],
+                data=csv_data,
+                file_name=filename,
+                mime="text/csv",
+                key=f"download_{export_format}_csv",
+                help=options['help']
+            )
 
 # Check available captions function
 def check_available_captions(video_id):
     """Check what captions are available for a video"""
     try:
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
         manual_captions = []
         auto_captions = []
         
-        for transcript in transcript_list:
+        with profiling.span("caption_tracks", cached=True):
+            tracks = list_caption_tracks(video_id)
+        for track in tracks:
             caption_info = {
-                'language': transcript.language,
-                'language_code': transcript.language_code,
-                'type': 'Auto-generated' if transcript.is_generated else 'Manual'
+                'language': track['language_name'],
+                'language_code': track['lang'],
+                'type': 'Auto-generated' if track['is_generated'] else 'Manual'
             }
             
-            if transcript.is_generated:
+            if track['is_generated']:
                 auto_captions.append(caption_info)
             else:
                 manual_captions.append(caption_info)
         
         return manual_captions, auto_captions
     except Exception as e:
+        logger.error(f"Could not list captions for {video_id}: {e}")
         return [], []
 
+# Number of videos extracted at the same time in batch mode
+BATCH_WORKERS = 6
+
+def extract_playlist_id(url):
+    """Extract playlist ID from a YouTube playlist URL (or return the ID itself)"""
+    if 'list=' in url:
+        return url.split('list=')[1].split('&')[0]
+    return url.strip()
+
+# Function to list the videos of a playlist (needs a YouTube Data API key)
+def get_playlist_video_ids(playlist_id, api_key):
+    youtube = build_youtube(api_key)
+    return [
+        item['snippet']['resourceId']['videoId']
+        for item in video_catalog.iter_playlist_items(youtube, playlist_id)
+    ]
+
+# Function to extract many videos in a worker pool and stream the results into one file.
+# Each video is written as soon as all of its languages are in, so only the videos still
+# being fetched are held in memory. Failed videos are reported and skipped; they never
+# abort the batch.
+def batch_extract(video_ids, languages, output_format):
+    """Returns (file bytes, file extension, {video_id: status}, failures DataFrame)"""
+    statuses = {video_id: "⏳ waiting" for video_id in video_ids}
+    tracks = {video_id: {} for video_id in video_ids}  # video_id -> {language: (transcript, language name, is_generated)}
+    remaining = {video_id: len(languages) for video_id in video_ids}
+    status_table = st.empty()
+    progress_bar = st.progress(0.0, text=f"0/{len(video_ids) * len(languages)} transcripts")
+    
+    def show_statuses():
+        status_table.dataframe(
+            pd.DataFrame({'video_id': list(statuses), 'status': list(statuses.values())}),
+            use_container_width=True
+        )
+    show_statuses()
+    
+    archive_buffer = io.BytesIO()
+    archive = zipfile.ZipFile(archive_buffer, 'w', zipfile.ZIP_DEFLATED) if output_format == 'zip' else None
+    combined = io.StringIO()
+    pd.DataFrame(columns=[name for name, _ in EXPORT_COLUMNS['full']]).to_csv(combined, index=False)
+    failures = []
+    done = 0
+    total = len(video_ids) * len(languages)
+    
+    def write_video(video_id):
+        data = TranscriptColumns(video_id)
+        for language in languages:
+            if language in tracks[video_id]:
+                transcript, language_name, is_generated = tracks[video_id][language]
+                data.add_track(language, language_name, is_generated, transcript)
+        del tracks[video_id]
+        if not data:
+            return
+        if archive is not None:
+            archive.writestr(f"{video_id}.csv", data.to_csv('full'))
+        else:
+            data.to_frame(EXPORT_COLUMNS['full']).to_csv(combined, index=False, header=False)
+    
+    # One pool over every (video, language) pair, video by video, so early videos finish first
+    pairs = [(video_id, language) for video_id in video_ids for language in languages]
+    for (video_id, language), track, error in transcript_fetcher.iter_transcripts(
+            pairs, None, max_workers=BATCH_WORKERS,
+            fetch_one=lambda pair, _: transcript_fetcher.get_transcript_track(*pair)):
+        done += 1
+        if error:
+            failures.append({'video_id': video_id, 'language': language, 'error': error})
+            statuses[video_id] = f"❌ {language}: {error}"
+        elif not track[0]:
+            failures.append({'video_id': video_id, 'language': language, 'error': "no captions"})
+            statuses[video_id] = f"⚠️ {language}: no captions"
+        else:
+            transcript, caption_type, language_name = track
+            tracks[video_id][language] = (transcript, language_name, caption_type == 'Auto-generated')
+            statuses[video_id] = f"✅ {language}: {len(transcript)} segments"
+        remaining[video_id] -= 1
+        if not remaining[video_id]:
+            write_video(video_id)
+        progress_bar.progress(done / total, text=f"{done}/{total} transcripts")
+        show_statuses()
+    
+    failures_df = pd.DataFrame(failures, columns=['video_id', 'language', 'error'])
+    if archive is not None:
+        if failures:
+            archive.writestr("failures.csv", failures_df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig'))
+        archive.close()
+        return archive_buffer.getvalue(), "zip", statuses, failures_df
+    
+    return combined.getvalue().encode('utf-8-sig'), "csv", statuses, failures_df
+
+# Batch mode interface: a list of URLs or a playlist, extracted into one download
+def batch_mode():
+    video_urls = st.text_area(
+        "YouTube Video URLs (one per line):",
+        placeholder="https://www.youtube.com/watch?v=...\nhttps://youtu.be/...",
+        height=150
+    )
+    playlist_url = st.text_input("Or a playlist URL / ID:", placeholder="https://www.youtube.com/playlist?list=...")
+    api_key = ""
+    if playlist_url:
+        api_key = st.text_input("YouTube API Key (needed to read playlists)", type="password")
+    
+    languages = st.multiselect(
+        "Caption languages:",
+        options=['ko', 'en', 'ja', 'zh-Hans', 'zh-Hant', 'es', 'fr', 'de', 'vi', 'th'],
+        default=['ko'],
+        help="Manual captions are used when available, otherwise auto-generated ones"
+    )
+    output_format = st.radio(
+        "Output:",
+        ['zip', 'csv'],
+        format_func=lambda x: "Zip archive (one CSV per video)" if x == 'zip' else "One combined CSV",
+        horizontal=True
+    )
+    
+    if st.button("📥 Extract All", key="batch_extract"):
+        video_ids = [extract_video_id(line.strip()) for line in video_urls.splitlines() if line.strip()]
+        if playlist_url:
+            if not api_key:
+                st.error("Please enter an API key to read the playlist.")
+                return
+            try:
+                video_ids += get_playlist_video_ids(extract_playlist_id(playlist_url), api_key)
+            except Exception as e:
+                st.error(f"❌ Could not read playlist: {str(e)}")
+        video_ids = list(dict.fromkeys(video_ids))
+        
+        if not video_ids or not languages:
+            st.error("Please enter at least one video and one language.")
+            return
+        
+        with profiling.span("batch_extract"):
+            data, extension, statuses, failures = batch_extract(video_ids, languages, output_format)
+        st.session_state.batch_result = {
+            'data': data,
+            'file_name': f"transcripts_{len(video_ids)}videos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            'mime': "application/zip" if extension == 'zip' else "text/csv",
+            'failures': failures,
+            'total': len(video_ids)
+        }
+    
+    result = st.session_state.get('batch_result')
+    if result:
+        failed_videos = result['failures']['video_id'].nunique() if len(result['failures']) else 0
+        st.markdown(f"""
+        <div class="success-box">
+        <strong>✅ Batch finished:</strong> {result['total']} videos, {len(result['failures'])} failed transcripts in {failed_videos} videos
+        </div>
+        """, unsafe_allow_html=True)
+        if len(result['failures']):
+            st.dataframe(result['failures'], use_container_width=True)
+        st.download_button(
+            label="📦 Download Batch",
+            data=result['data'],
+            file_name=result['file_name'],
+            mime=result['mime'],
+            key="download_batch"
+        )
+
 # Main Streamlit Interface
 def main():
     st.markdown("<h3 class='title'>🎯 YouTube Transcript Extractor</h1>", unsafe_allow_html=True)
@@ -345,6 +540,11 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    mode = st.radio("Mode:", ["Single video", "Batch (URL list or playlist)"], horizontal=True)
+    if mode != "Single video":
+        batch_mode()
+        return
+    
     # Video URL input
     video_url = st.text_input(
         "YouTube Video URL:",
@@ -361,6 +561,7 @@ def main():
             st.session_state.current_video_id = video_id
             st.session_state.available_transcripts = []
             st.session_state.extracted_data = []
+            st.session_state.extracted_hash = ""
         
         # Check captions button
         col1, col2 = st.columns(2)
@@ -373,18 +574,10 @@ def main():
                     if manual_caps or auto_caps:
                         st.success("✅ Captions found!")
                         
-                        # Store available transcripts in session state
+                        # Store available transcripts in session state (same cached listing, no second call)
                         try:
-                            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                            st.session_state.available_transcripts = []
-                            
-                            for transcript_info in transcript_list:
-                                st.session_state.available_transcripts.append({
-                                    'lang': transcript_info.language_code,
-                                    'language_name': transcript_info.language,
-                                    'is_generated': transcript_info.is_generated,
-                                    'transcript': transcript_info
-                                })
+                            with profiling.span("caption_tracks", cached=True):
+                                st.session_state.available_transcripts = list_caption_tracks(video_id)
                         except Exception as e:
                             st.error(f"Error getting transcript details: {str(e)}")
                         
@@ -429,11 +622,12 @@ def main():
                 with col2:
                     if st.button("📥 Extract Selected Transcripts", key="extract_transcript"):
                         if selected_options:
-                            with st.spinner("Extracting transcript(s)..."):
+                            with st.spinner("Extracting transcript(s)..."), profiling.span("extract_transcript"):
                                 transcript_data = extract_transcript(video_id, selected_options)
                             
                             if transcript_data:
                                 st.session_state.extracted_data = transcript_data
+                                st.session_state.extracted_hash = transcript_data.content_hash()
                             else:
                                 st.error("❌ Could not extract transcript from this video")
         
@@ -442,10 +636,10 @@ def main():
             st.markdown("---")
             
             # Show success info
-            total_duration = max([entry['end_time_seconds'] for entry in st.session_state.extracted_data])
+            total_duration = st.session_state.extracted_data.total_duration()
             
             # Group by language for display
-            languages = list(set([entry['language_name'] for entry in st.session_state.extracted_data]))
+            languages = st.session_state.extracted_data.language_names()
             
             st.markdown(f"""
             <div class="success-box">
@@ -457,18 +651,21 @@ def main():
             
             # Show preview
             st.markdown("**Preview (first 5 segments):**")
-            preview_df = pd.DataFrame(st.session_state.extracted_data[:5])[['timestamp', 'language_name', 'text']]
+            preview_df = st.session_state.extracted_data.to_frame(['timestamp', 'language_name', 'text'], stop=5)
             st.dataframe(preview_df, use_container_width=True)
             
             # Download options
             video_title = f"video_{video_id}"
-            save_transcript_options(st.session_state.extracted_data, video_title)
+            save_transcript_options(st.session_state.extracted_data, video_title, st.session_state.extracted_hash)
     
 
 
 
 if __name__ == "__main__":
+    # Opt-in timing of this page's hot sections (set APP_PROFILING=1)
+    profiling.start("extractor")
     main()
+    profiling.finish()
 
 
 